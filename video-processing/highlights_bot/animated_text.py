@@ -5,6 +5,9 @@ Implements kinetic typography effects (pop, slide, bounce, pulse, fade, typewrit
 
 import subprocess
 import os
+from concurrent.futures import ThreadPoolExecutor
+
+from encoders import get_encoder_args
 
 
 # Effect library with metadata
@@ -42,10 +45,52 @@ EFFECT_LIBRARY = {
 }
 
 
+# drawtext options shared by every effect; effects vary fontsize/x/y and timing
+_DRAWTEXT_TMPL = (
+    "drawtext=text='{text}':"
+    "fontsize={fontsize}:"
+    "x={x}:y={y}:"
+    "fontcolor={font_color}:"
+    "borderw={border_width}:bordercolor={border_color}"
+)
+
+# Most drawtext layers an alpha ramp may use (about 1s of per-frame steps at
+# 30fps); longer ramps stretch each step over several frames instead
+MAX_ALPHA_STEPS = 30
+
+
+def _alpha_steps(ramp_duration, duration, fps=30):
+    """
+    Quantize a linear 0 -> 1 alpha ramp into per-frame steps.
+
+    Returns a list of drawtext option strings, one per layer, each with a
+    fixed 8-bit alpha and a half-open enable window. The last layer holds
+    full opacity until the end of the caption. At most MAX_ALPHA_STEPS ramp
+    layers are used, none of them past duration, and a ramp of zero length
+    gives a single opaque layer.
+    """
+    if ramp_duration <= 0:
+        return [f"enable='between(t,0,{duration})'"]
+
+    steps = []
+    count = min(MAX_ALPHA_STEPS, max(1, int(round(ramp_duration * fps))))
+    step = ramp_duration / count
+    for i in range(count):
+        t_start = i * step
+        if t_start >= duration:
+            break  # The caption ends before the ramp does
+        t_end = min((i + 1) * step, duration)
+        alpha_u8 = min(255, int(round(255 * i / count)))
+        steps.append(f"alpha={alpha_u8 / 255:.4f}:enable='gte(t,{t_start:.4f})*lt(t,{t_end:.4f})'")
+    if ramp_duration < duration:
+        steps.append(f"enable='between(t,{ramp_duration:.4f},{duration})'")
+    return steps
+
+
 def add_animated_caption(input_path, output_path, caption_text, effect='pop',
                         position='center', duration=None, font_size=56,
                         font_color='white', border_color='black', border_width=3,
-                        font_path=None):
+                        font_path=None, threads=None, encoder=None):
     """
     Add animated text caption to video.
 
@@ -61,6 +106,8 @@ def add_animated_caption(input_path, output_path, caption_text, effect='pop',
         border_color: Border/outline color
         border_width: Border width in pixels
         font_path: Path to font file (optional)
+        threads: FFmpeg thread count (None = let FFmpeg decide)
+        encoder: 'nvenc', 'cpu', or None/'auto' (see get_encoder_args)
 
     Returns:
         output_path: Path to video with animated caption
@@ -97,70 +144,37 @@ def add_animated_caption(input_path, output_path, caption_text, effect='pop',
             font_path = 'C:/Windows/Fonts/arialbd.ttf'
         # If no font found, FFmpeg will use default
 
-    # Build animation filter based on effect
+    # Per-layer timing options; alpha ramps use one layer per step (see _alpha_steps)
+    layers = [f"enable='between(t,0,{duration})'"]
+    fontsize_expr = font_size
+
+    # Build animation based on effect
     if effect == 'pop':
         # Scale animation: small to normal over 0.3s
         anim_duration = 0.3
-        drawtext_filter = (
-            f"drawtext=text='{caption_escaped}':"
-            f"fontsize={font_size}*min(1\\,t/{anim_duration}):"  # Scale up
-            f"x={x_pos}:y={y_pos}:"
-            f"fontcolor={font_color}:"
-            f"borderw={border_width}:bordercolor={border_color}:"
-            f"enable='between(t,0,{duration})'"
-        )
+        fontsize_expr = f"{font_size}*min(1\\,t/{anim_duration})"  # Scale up
 
     elif effect == 'slide_in':
         # Slide from right to center over 0.4s
         anim_duration = 0.4
-        drawtext_filter = (
-            f"drawtext=text='{caption_escaped}':"
-            f"fontsize={font_size}:"
-            f"x=w-(w+text_w)*min(1\\,t/{anim_duration}):"  # Slide from right
-            f"y={y_pos}:"
-            f"fontcolor={font_color}:"
-            f"borderw={border_width}:bordercolor={border_color}:"
-            f"enable='between(t,0,{duration})'"
-        )
+        x_pos = f"w-(w+text_w)*min(1\\,t/{anim_duration})"  # Slide from right
 
     elif effect == 'bounce':
         # Bounce in with spring effect (quadratic ease-out)
         anim_duration = 0.5
         # Bounce from top with decay
         bounce_expr = f"max(0\\,1-t/{anim_duration})*max(0\\,1-t/{anim_duration})"
-        drawtext_filter = (
-            f"drawtext=text='{caption_escaped}':"
-            f"fontsize={font_size}:"
-            f"x={x_pos}:"
-            f"y={y_pos}-(h*0.3)*{bounce_expr}:"  # Bounce from top
-            f"fontcolor={font_color}:"
-            f"borderw={border_width}:bordercolor={border_color}:"
-            f"enable='between(t,0,{duration})'"
-        )
+        y_pos = f"{y_pos}-(h*0.3)*{bounce_expr}"  # Bounce from top
 
     elif effect == 'fade_in':
         # Fade in from transparent over 0.3s
         anim_duration = 0.3
-        drawtext_filter = (
-            f"drawtext=text='{caption_escaped}':"
-            f"fontsize={font_size}:"
-            f"x={x_pos}:y={y_pos}:"
-            f"fontcolor={font_color}@min(1\\,t/{anim_duration}):"  # Alpha fade
-            f"borderw={border_width}:bordercolor={border_color}@min(1\\,t/{anim_duration}):"
-            f"enable='between(t,0,{duration})'"
-        )
+        layers = _alpha_steps(anim_duration, duration)  # Alpha fade
 
     elif effect == 'pulse':
         # Continuous pulse effect
         pulse_speed = 2.0  # Pulses per second
-        drawtext_filter = (
-            f"drawtext=text='{caption_escaped}':"
-            f"fontsize={font_size}*(1+0.1*sin(2*PI*{pulse_speed}*t)):"  # 10% size variation
-            f"x={x_pos}:y={y_pos}:"
-            f"fontcolor={font_color}:"
-            f"borderw={border_width}:bordercolor={border_color}:"
-            f"enable='between(t,0,{duration})'"
-        )
+        fontsize_expr = f"{font_size}*(1+0.1*sin(2*PI*{pulse_speed}*t))"  # 10% size variation
 
     elif effect == 'typewriter':
         # Character-by-character reveal (simplified - shows full text with fade)
@@ -168,32 +182,22 @@ def add_animated_caption(input_path, output_path, caption_text, effect='pop',
         char_duration = 0.05  # 0.05s per character
         total_chars = len(caption_text)
         typewriter_duration = total_chars * char_duration
+        layers = _alpha_steps(typewriter_duration, duration)
 
-        drawtext_filter = (
-            f"drawtext=text='{caption_escaped}':"
-            f"fontsize={font_size}:"
-            f"x={x_pos}:y={y_pos}:"
-            f"fontcolor={font_color}@min(1\\,t/{typewriter_duration}):"
-            f"borderw={border_width}:bordercolor={border_color}@min(1\\,t/{typewriter_duration}):"
-            f"enable='between(t,0,{duration})'"
-        )
+    # Any other effect: static text
 
-    else:
-        # Default: static text
-        drawtext_filter = (
-            f"drawtext=text='{caption_escaped}':"
-            f"fontsize={font_size}:"
-            f"x={x_pos}:y={y_pos}:"
-            f"fontcolor={font_color}:"
-            f"borderw={border_width}:bordercolor={border_color}:"
-            f"enable='between(t,0,{duration})'"
-        )
+    drawtext_base = _DRAWTEXT_TMPL.format(
+        text=caption_escaped, fontsize=fontsize_expr, x=x_pos, y=y_pos,
+        font_color=font_color, border_width=border_width, border_color=border_color
+    )
 
     # Add font if available
     if font_path and os.path.exists(font_path):
         # Escape backslashes in Windows paths
         font_path_escaped = font_path.replace('\\', '\\\\\\\\')
-        drawtext_filter += f":fontfile={font_path_escaped}"
+        drawtext_base += f":fontfile={font_path_escaped}"
+
+    drawtext_filter = ','.join(f"{drawtext_base}:{layer}" for layer in layers)
 
     # Apply filter
     cmd = [
@@ -201,11 +205,11 @@ def add_animated_caption(input_path, output_path, caption_text, effect='pop',
         '-i', input_path,
         '-vf', drawtext_filter,
         '-c:a', 'copy',  # Copy audio
-        '-c:v', 'libx264',
-        '-crf', '18',
-        '-preset', 'medium',
-        '-y', output_path
+        *get_encoder_args(encoder),
     ]
+    if threads:
+        cmd += ['-threads', str(threads)]
+    cmd += ['-y', output_path]
 
     print(f"  ├─ Adding {effect} animation...")
     subprocess.run(cmd, check=True, capture_output=True)
@@ -214,7 +218,8 @@ def add_animated_caption(input_path, output_path, caption_text, effect='pop',
     return output_path
 
 
-def add_event_caption_animated(input_path, output_path, event, effect='auto', config=None):
+def add_event_caption_animated(input_path, output_path, event, effect='auto', config=None,
+                               encoder=None):
     """
     Add animated caption for a specific event.
     Automatically selects effect based on event type.
@@ -225,6 +230,7 @@ def add_event_caption_animated(input_path, output_path, event, effect='auto', co
         event: Event dictionary with type, player, etc.
         effect: Animation effect or 'auto' for automatic selection
         config: Optional config
+        encoder: 'nvenc', 'cpu', or None/'auto' (see get_encoder_args)
 
     Returns:
         output_path: Path to video with animated caption
@@ -266,11 +272,13 @@ def add_event_caption_animated(input_path, output_path, event, effect='auto', co
         font_size=font_size,
         font_color='white',
         border_color='black',
-        border_width=3
+        border_width=3,
+        encoder=encoder
     )
 
 
-def add_multi_caption_animated(input_path, output_path, captions_timeline, effect='auto'):
+def add_multi_caption_animated(input_path, output_path, captions_timeline, effect='auto',
+                               encoder=None):
     """
     Add multiple animated captions at different timestamps.
 
@@ -279,6 +287,7 @@ def add_multi_caption_animated(input_path, output_path, captions_timeline, effec
         output_path: Output video
         captions_timeline: List of (start_time, end_time, text, effect) tuples
         effect: Default effect if not specified in timeline
+        encoder: 'nvenc', 'cpu', or None/'auto' (see get_encoder_args)
 
     Returns:
         output_path: Path to video with animated captions
@@ -298,14 +307,10 @@ def add_multi_caption_animated(input_path, output_path, captions_timeline, effec
         text_escaped = text.replace("'", "'\\\\\\''").replace(":", "\\\\:")
 
         # Build filter for this caption (simplified - using fade_in)
-        filter_part = (
-            f"drawtext=text='{text_escaped}':"
-            f"fontsize=56:"
-            f"x=(w-text_w)/2:y=h*0.85-text_h:"
-            f"fontcolor=white:"
-            f"borderw=3:bordercolor=black:"
-            f"enable='between(t,{start_time},{end_time})'"
-        )
+        filter_part = _DRAWTEXT_TMPL.format(
+            text=text_escaped, fontsize=56, x='(w-text_w)/2', y='h*0.85-text_h',
+            font_color='white', border_width=3, border_color='black'
+        ) + f":enable='between(t,{start_time},{end_time})'"
 
         filters.append(filter_part)
 
@@ -321,9 +326,7 @@ def add_multi_caption_animated(input_path, output_path, captions_timeline, effec
         '-i', input_path,
         '-vf', combined_filter,
         '-c:a', 'copy',
-        '-c:v', 'libx264',
-        '-crf', '18',
-        '-preset', 'medium',
+        *get_encoder_args(encoder),
         '-y', output_path
     ]
 
@@ -343,13 +346,19 @@ def get_effect_info():
     return EFFECT_LIBRARY
 
 
-def test_all_effects(input_path, output_dir='test_output/animated_text'):
+def test_all_effects(input_path, output_dir='test_output/animated_text', max_workers=None,
+                     encoder=None):
     """
     Generate test videos for all animation effects.
 
+    Effects are rendered concurrently, one FFmpeg process per effect, each
+    limited to 2 threads so the encodes don't oversubscribe the CPU.
+
     Args:
         input_path: Input test video
         output_dir: Output directory for test videos
+        max_workers: Number of concurrent encodes (default: half the CPUs)
+        encoder: 'nvenc', 'cpu', or None/'auto' (see get_encoder_args)
 
     Returns:
         List of output paths
@@ -357,25 +366,33 @@ def test_all_effects(input_path, output_dir='test_output/animated_text'):
     os.makedirs(output_dir, exist_ok=True)
 
     test_text = "⚽ GOAL! Mohamed Salah"
-    outputs = []
-
-    for effect_name in EFFECT_LIBRARY.keys():
-        output_path = os.path.join(output_dir, f'test_{effect_name}.mp4')
-
-        print(f"\nTesting effect: {effect_name}")
-        print(f"  Description: {EFFECT_LIBRARY[effect_name]['description']}")
-
-        add_animated_caption(
-            input_path,
-            output_path,
-            test_text,
-            effect=effect_name,
-            position='bottom',
-            duration=5.0,
-            font_size=56
-        )
 
-        outputs.append(output_path)
+    if max_workers is None:
+        max_workers = max(1, min(len(EFFECT_LIBRARY), (os.cpu_count() or 2) // 2))
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = []
+        for effect_name in EFFECT_LIBRARY.keys():
+            output_path = os.path.join(output_dir, f'test_{effect_name}.mp4')
+
+            print(f"\nTesting effect: {effect_name}")
+            print(f"  Description: {EFFECT_LIBRARY[effect_name]['description']}")
+
+            futures.append(executor.submit(
+                add_animated_caption,
+                input_path,
+                output_path,
+                test_text,
+                effect=effect_name,
+                position='bottom',
+                duration=5.0,
+                font_size=56,
+                threads=2,
+                encoder=encoder
+            ))
+
+        # result() re-raises the first failure, as the serial loop did
+        outputs = [future.result() for future in futures]
 
     print(f"\n✅ Generated {len(outputs)} test videos in {output_dir}")
     return outputs
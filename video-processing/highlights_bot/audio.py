@@ -8,20 +8,72 @@ import json
 import re
 
 
-def normalize_loudness(input_path, output_path, target_lufs=-14.0, true_peak=-1.5):
+def _remux(input_path, output_path):
+    """
+    Copy all streams into a new container without re-encoding.
+
+    Used when the requested processing is a no-op.
+
+    Returns: Path to remuxed video
+    """
+    cmd = [
+        'ffmpeg', '-y', '-i', input_path,
+        '-c', 'copy', '-movflags', '+faststart',
+        output_path
+    ]
+
+    subprocess.run(cmd, check=True, capture_output=True)
+    return output_path
+
+
+def decode_audio(input_path, wav_path, sample_rate=48000):
+    """
+    Decode the audio track of a video to 16-bit PCM WAV.
+
+    The WAV can be passed as audio_src to the processing functions below so
+    several operations on the same video share a single decode.
+
+    Returns: Path to WAV file
+    """
+    cmd = [
+        'ffmpeg', '-y', '-i', input_path,
+        '-vn', '-acodec', 'pcm_s16le', '-ar', str(sample_rate),
+        wav_path
+    ]
+
+    subprocess.run(cmd, check=True, capture_output=True)
+    return wav_path
+
+
+def _audio_inputs(input_path, audio_src):
+    """
+    FFmpeg input arguments for a video whose audio may come from audio_src.
+
+    With audio_src, video is mapped from input_path and audio from the
+    pre-decoded file; otherwise input_path supplies both.
+    """
+    if audio_src:
+        return ['-i', input_path, '-i', audio_src, '-map', '0:v?', '-map', '1:a']
+    return ['-i', input_path]
+
+
+def normalize_loudness(input_path, output_path, target_lufs=-14.0, true_peak=-1.5,
+                       audio_src=None):
     """
     Normalize audio to broadcast standard (-14 LUFS).
 
     Parameters:
     - target_lufs: Target integrated loudness (-14 LUFS is broadcast standard)
     - true_peak: Maximum true peak level (-1.5 dBTP prevents clipping)
+    - audio_src: Optional pre-decoded audio (see decode_audio) to use instead
+      of decoding the audio track of input_path
 
     Returns: Path to normalized audio video
     """
     # Two-pass loudnorm
     # Pass 1: Measure loudness
     cmd_measure = [
-        'ffmpeg', '-i', input_path,
+        'ffmpeg', '-i', audio_src or input_path,
         '-af', f'loudnorm=I={target_lufs}:TP={true_peak}:LRA=11:print_format=json',
         '-f', 'null', '-'
     ]
@@ -59,7 +111,7 @@ def normalize_loudness(input_path, output_path, target_lufs=-14.0, true_peak=-1.
 
     # Pass 2: Apply normalization with measured values
     cmd_normalize = [
-        'ffmpeg', '-i', input_path,
+        'ffmpeg', *_audio_inputs(input_path, audio_src),
         '-af', f'loudnorm=I={target_lufs}:TP={true_peak}:LRA=11:' +
                f'measured_I={measured_i}:measured_TP={measured_tp}:' +
                f'measured_LRA={measured_lra}:measured_thresh={measured_thresh}:' +
@@ -76,7 +128,7 @@ def normalize_loudness(input_path, output_path, target_lufs=-14.0, true_peak=-1.
 
 
 def duck_audio_during_overlays(input_path, output_path, overlay_times,
-                               duck_amount_db=-3.0, fade_duration=0.5):
+                               duck_amount_db=-3.0, fade_duration=0.5, audio_src=None):
     """
     Duck (reduce) audio during overlay/voiceover segments.
 
@@ -84,6 +136,7 @@ def duck_audio_during_overlays(input_path, output_path, overlay_times,
     - overlay_times: List of (start, end) tuples in seconds
     - duck_amount_db: How much to reduce audio (-3 dB = half volume)
     - fade_duration: Crossfade duration in seconds
+    - audio_src: Optional pre-decoded audio (see decode_audio)
 
     Returns: Path to ducked audio video
     """
@@ -117,7 +170,7 @@ def duck_audio_during_overlays(input_path, output_path, overlay_times,
         full_filter = 'anull'  # No ducking
 
     cmd = [
-        'ffmpeg', '-i', input_path,
+        'ffmpeg', *_audio_inputs(input_path, audio_src),
         '-af', full_filter,
         '-c:v', 'copy', '-c:a', 'aac', '-b:a', '192k',
         '-y', output_path
@@ -129,18 +182,26 @@ def duck_audio_during_overlays(input_path, output_path, overlay_times,
     return output_path
 
 
-def apply_peak_limiter(input_path, output_path, threshold_db=-2.0, release_ms=50):
+def apply_peak_limiter(input_path, output_path, threshold_db=-2.0, release_ms=50,
+                       audio_src=None):
     """
     Apply peak limiter to prevent audio clipping.
 
     Parameters:
     - threshold_db: Threshold level in dB (default -2.0)
     - release_ms: Release time in milliseconds (default 50ms)
+    - audio_src: Optional pre-decoded audio (see decode_audio)
 
     Returns: Path to limited audio video
     """
+    if threshold_db >= 0:
+        # alimiter cannot limit above 0 dBFS, so there is nothing to do
+        _remux(input_path, output_path)
+        print(f"  ✓ No limiting needed (threshold: {threshold_db} dB)")
+        return output_path
+
     cmd = [
-        'ffmpeg', '-i', input_path,
+        'ffmpeg', *_audio_inputs(input_path, audio_src),
         '-af', f'alimiter=limit={threshold_db}dB:attack=5:release={release_ms}:level=false',
         '-c:v', 'copy', '-c:a', 'aac', '-b:a', '192k',
         '-y', output_path
@@ -152,16 +213,23 @@ def apply_peak_limiter(input_path, output_path, threshold_db=-2.0, release_ms=50
     return output_path
 
 
-def add_audio_fade(input_path, output_path, fade_in_duration=0.5, fade_out_duration=1.0):
+def add_audio_fade(input_path, output_path, fade_in_duration=0.5, fade_out_duration=1.0,
+                   audio_src=None):
     """
     Add fade in/out to audio.
 
     Parameters:
     - fade_in_duration: Fade in duration in seconds
     - fade_out_duration: Fade out duration in seconds
+    - audio_src: Optional pre-decoded audio (see decode_audio)
 
     Returns: Path to faded audio video
     """
+    if fade_in_duration <= 0 and fade_out_duration <= 0:
+        _remux(input_path, output_path)
+        print(f"  ✓ No fades needed (in: {fade_in_duration}s, out: {fade_out_duration}s)")
+        return output_path
+
     # Get video duration
     probe_cmd = [
         'ffprobe', '-v', 'error', '-show_entries', 'format=duration',
@@ -177,7 +245,7 @@ def add_audio_fade(input_path, output_path, fade_in_duration=0.5, fade_out_durat
     audio_filter = f'afade=t=in:st=0:d={fade_in_duration},afade=t=out:st={fade_out_start}:d={fade_out_duration}'
 
     cmd = [
-        'ffmpeg', '-i', input_path,
+        'ffmpeg', *_audio_inputs(input_path, audio_src),
         '-af', audio_filter,
         '-c:v', 'copy', '-c:a', 'aac', '-b:a', '192k',
         '-y', output_path
@@ -256,7 +324,7 @@ def extract_audio_info(input_path):
     return None
 
 
-def apply_professional_audio_chain(input_path, output_path, config=None):
+def apply_professional_audio_chain(input_path, output_path, config=None, audio_src=None):
     """
     Apply complete professional audio processing chain.
 
@@ -264,6 +332,7 @@ def apply_professional_audio_chain(input_path, output_path, config=None):
 
     Parameters:
     - config: Optional configuration dict with processing parameters
+    - audio_src: Optional pre-decoded audio for the first step (see decode_audio)
 
     Returns: Path to processed audio video
     """
@@ -284,7 +353,7 @@ def apply_professional_audio_chain(input_path, output_path, config=None):
         # Step 1: Normalize loudness
         target_lufs = config.get('target_lufs', -14.0)
         true_peak = config.get('true_peak', -1.5)
-        normalize_loudness(input_path, temp1, target_lufs, true_peak)
+        normalize_loudness(input_path, temp1, target_lufs, true_peak, audio_src=audio_src)
 
         # Step 2: Peak limiter
         threshold_db = config.get('limiter_threshold', -2.0)
@@ -6,6 +6,8 @@ Generates subtitle files and burns captions into video
 import subprocess
 import os
 
+from encoders import get_encoder_args
+
 
 def format_srt_time(seconds):
     """
@@ -23,86 +25,95 @@ def generate_srt_captions(events, match_meta, output_path):
     """
     Generate SRT caption file from events.
 
+    Events may be any iterable (including a generator); each entry is
+    written to the file as soon as it is formatted.
+
     Returns: Path to SRT file
     """
-    srt_entries = []
+    count = 0
 
-    for idx, event in enumerate(events, start=1):
-        # Calculate timestamps
-        video_timestamp = event.get('video_timestamp', event.get('abs_ts', event.get('timestamp', 0)))
-        duration = event.get('duration', 5.0)
+    with open(output_path, 'w', encoding='utf-8', buffering=1 << 20) as f:
+        for idx, event in enumerate(events, start=1):
+            # Calculate timestamps
+            video_timestamp = event.get('video_timestamp', event.get('abs_ts', event.get('timestamp', 0)))
+            duration = event.get('duration', 5.0)
 
-        start_time = format_srt_time(video_timestamp)
-        end_time = format_srt_time(video_timestamp + duration)
+            start_time = format_srt_time(video_timestamp)
+            end_time = format_srt_time(video_timestamp + duration)
 
-        # Generate caption text based on event type
-        event_type = event.get('type', 'highlight')
+            text = _srt_entry_text(event)
 
-        if event_type == 'goal':
-            player = event.get('player', 'Unknown')
-            team = event.get('team', '')
-            minute = event.get('minute', '')
-            text = f"⚽ GOAL! {player} ({team}) {minute}'"
+            f.write(f"{idx}\n{start_time} --> {end_time}\n{text}\n\n")
+            count = idx
 
-            if event.get('assister') or event.get('assist'):
-                assister = event.get('assister', event.get('assist'))
-                text += f"\nAssist: {assister}"
+    print(f"✅ SRT captions generated: {output_path} ({count} entries)")
+    return output_path
 
-        elif event_type == 'chance':
-            team = event.get('team', 'Team')
-            text = f"🎯 Big chance for {team}"
 
-        elif event_type == 'card':
-            player = event.get('player', 'Unknown')
-            card_type = event.get('card_type', 'yellow')
-            minute = event.get('minute', '')
-            emoji = '🟨' if card_type == 'yellow' else '🟥'
-            text = f"{emoji} {player} {minute}'"
+def _srt_entry_text(event):
+    """Build the SRT caption text for a single event."""
+    event_type = event.get('type', 'highlight')
 
-        elif event_type == 'skill':
-            player = event.get('player', 'Player')
-            text = f"⭐ Great skill from {player}"
+    if event_type == 'goal':
+        player = event.get('player', 'Unknown')
+        team = event.get('team', '')
+        minute = event.get('minute', '')
+        text = f"⚽ GOAL! {player} ({team}) {minute}'"
 
-        elif event_type == 'save':
-            player = event.get('player', 'Keeper')
-            text = f"🧤 Save by {player}"
+        if event.get('assister') or event.get('assist'):
+            assister = event.get('assister', event.get('assist'))
+            text += f"\nAssist: {assister}"
 
-        elif event_type == 'tackle':
-            player = event.get('player', 'Player')
-            text = f"💪 Tackle by {player}"
+    elif event_type == 'chance':
+        team = event.get('team', 'Team')
+        text = f"🎯 Big chance for {team}"
 
+    elif event_type == 'card':
+        player = event.get('player', 'Unknown')
+        card_type = event.get('card_type', 'yellow')
+        minute = event.get('minute', '')
+        emoji = '🟨' if card_type == 'yellow' else '🟥'
+        text = f"{emoji} {player} {minute}'"
+
+    elif event_type == 'skill':
+        player = event.get('player', 'Player')
+        text = f"⭐ Great skill from {player}"
+
+    elif event_type == 'save':
+        player = event.get('player', 'Keeper')
+        text = f"🧤 Save by {player}"
+
+    elif event_type == 'tackle':
+        player = event.get('player', 'Player')
+        text = f"💪 Tackle by {player}"
+
+    else:
+        # Generic caption from notes or type
+        notes = event.get('notes', '')
+        minute = event.get('minute', '')
+        if notes:
+            text = notes
         else:
-            # Generic caption from notes or type
-            notes = event.get('notes', '')
-            minute = event.get('minute', '')
-            if notes:
-                text = notes
-            else:
-                text = f"{event_type.title()}"
-                if minute:
-                    text += f" - {minute}'"
-
-        srt_entries.append({
-            'index': idx,
-            'start': start_time,
-            'end': end_time,
-            'text': text
-        })
-
-    # Write SRT file
-    with open(output_path, 'w', encoding='utf-8') as f:
-        for entry in srt_entries:
-            f.write(f"{entry['index']}\n")
-            f.write(f"{entry['start']} --> {entry['end']}\n")
-            f.write(f"{entry['text']}\n")
-            f.write("\n")
-
-    print(f"✅ SRT captions generated: {output_path} ({len(srt_entries)} entries)")
-    return output_path
+            text = f"{event_type.title()}"
+            if minute:
+                text += f" - {minute}'"
+
+    return text
+
+
+def _build_filter(name, options):
+    """
+    Build an FFmpeg filter string from an ordered mapping of options.
+
+    Options whose value is None are skipped, so optional settings can be
+    listed inline rather than appended conditionally.
+    """
+    args = ':'.join(f"{key}={value}" for key, value in options.items() if value is not None)
+    return f"{name}={args}"
 
 
 def burn_caption(input_path, output_path, caption_text, position='top',
-                duration=None, font_size=48, font_path=None):
+                duration=None, font_size=48, font_path=None, encoder=None):
     """
     Burn caption text into video.
 
@@ -112,6 +123,7 @@ def burn_caption(input_path, output_path, caption_text, position='top',
     - duration: How long to show caption (None = entire video)
     - font_size: Size of the font
     - font_path: Path to font file (optional)
+    - encoder: 'nvenc', 'cpu', or None/'auto' (see get_encoder_args)
 
     Returns: Path to output video
     """
@@ -141,25 +153,23 @@ def burn_caption(input_path, output_path, caption_text, position='top',
             # Fall back to default font (no fontfile parameter)
             font_path = None
 
-    # Build drawtext filter
-    drawtext = (
-        f"drawtext=text='{caption_text}':"
-        f"fontsize={font_size}:fontcolor=white:bordercolor=black:borderw=3:"
-        f"x=(w-text_w)/2:y={y_pos}"
-    )
-
-    if font_path:
-        # Escape backslashes in Windows paths
-        font_path_escaped = font_path.replace('\\', '\\\\\\\\')
-        drawtext += f":fontfile={font_path_escaped}"
-
-    if duration:
-        drawtext += f":enable='between(t,0,{duration})'"
+    # Build drawtext filter (escape backslashes in Windows font paths)
+    drawtext = _build_filter('drawtext', {
+        'text': f"'{caption_text}'",
+        'fontsize': font_size,
+        'fontcolor': 'white',
+        'bordercolor': 'black',
+        'borderw': 3,
+        'x': '(w-text_w)/2',
+        'y': y_pos,
+        'fontfile': font_path.replace('\\', '\\\\\\\\') if font_path else None,
+        'enable': f"'between(t,0,{duration})'" if duration else None,
+    })
 
     cmd = [
         'ffmpeg', '-i', input_path,
         '-vf', drawtext,
-        '-c:a', 'copy', '-c:v', 'libx264', '-crf', '18',
+        '-c:a', 'copy', *get_encoder_args(encoder),
         '-y', output_path
     ]
 
@@ -169,7 +179,8 @@ def burn_caption(input_path, output_path, caption_text, position='top',
     return output_path
 
 
-def burn_srt_file(input_path, output_path, srt_path, font_size=24, font_path=None):
+def burn_srt_file(input_path, output_path, srt_path, font_size=24, font_path=None,
+                  encoder=None, hard_burn=True):
     """
     Burn SRT subtitle file into video.
 
@@ -177,22 +188,42 @@ def burn_srt_file(input_path, output_path, srt_path, font_size=24, font_path=Non
     - srt_path: Path to SRT subtitle file
     - font_size: Size of the font
     - font_path: Path to font file (optional)
+    - encoder: 'nvenc', 'cpu', or None/'auto' (see get_encoder_args)
+    - hard_burn: Render subtitles into the picture (True) or mux them as a
+      soft mov_text track with audio/video stream-copied (False)
 
     Returns: Path to output video
     """
     if not os.path.exists(srt_path):
         raise FileNotFoundError(f"SRT file not found: {srt_path}")
 
+    if not hard_burn:
+        # No re-encode: copy audio/video as-is and add a selectable subtitle track
+        cmd = [
+            'ffmpeg', '-i', input_path, '-i', srt_path,
+            '-map', '0:v', '-map', '0:a?', '-map', '1:0',
+            '-c', 'copy', '-c:s', 'mov_text',
+            '-y', output_path
+        ]
+
+        subprocess.run(cmd, check=True, capture_output=True)
+
+        print(f"  ✓ SRT captions muxed as soft subtitles: {output_path}")
+        return output_path
+
     # Escape path for FFmpeg (especially for Windows)
     srt_path_escaped = srt_path.replace('\\', '\\\\\\\\').replace(':', '\\\\:')
 
     # Build subtitles filter
-    subtitles_filter = f"subtitles={srt_path_escaped}:force_style='FontSize={font_size},PrimaryColour=&HFFFFFF,OutlineColour=&H000000,BorderStyle=1,Outline=2'"
+    subtitles_filter = _build_filter('subtitles', {
+        'filename': srt_path_escaped,
+        'force_style': f"'FontSize={font_size},PrimaryColour=&HFFFFFF,OutlineColour=&H000000,BorderStyle=1,Outline=2'",
+    })
 
     cmd = [
         'ffmpeg', '-i', input_path,
         '-vf', subtitles_filter,
-        '-c:a', 'copy', '-c:v', 'libx264', '-crf', '18',
+        '-c:a', 'copy', *get_encoder_args(encoder),
         '-y', output_path
     ]
 
@@ -237,13 +268,14 @@ def generate_caption_text(event):
         return event_type.title()
 
 
-def add_auto_captions(input_path, output_path, events, style='modern'):
+def add_auto_captions(input_path, output_path, events, style='modern', encoder=None):
     """
     Add automatic captions to video based on events timeline.
 
     Parameters:
     - events: List of event dictionaries with timestamps
     - style: 'modern' (TikTok-style) or 'classic' (traditional subtitles)
+    - encoder: 'nvenc', 'cpu', or None/'auto' (see get_encoder_args)
 
     Returns: Path to output video
     """
@@ -257,10 +289,10 @@ def add_auto_captions(input_path, output_path, events, style='modern'):
     # Burn SRT with appropriate styling
     if style == 'modern':
         # Modern TikTok-style large captions
-        burn_srt_file(input_path, output_path, srt_temp, font_size=36)
+        burn_srt_file(input_path, output_path, srt_temp, font_size=36, encoder=encoder)
     else:
         # Classic broadcast subtitles
-        burn_srt_file(input_path, output_path, srt_temp, font_size=24)
+        burn_srt_file(input_path, output_path, srt_temp, font_size=24, encoder=encoder)
 
     # Cleanup temp SRT
     os.remove(srt_temp)
@@ -272,6 +304,9 @@ def validate_srt_file(srt_path):
     """
     Validate SRT file format and return any errors.
 
+    Single pass over the file, one line at a time, tracking where we are
+    inside the current entry (index -> timestamp -> text -> blank).
+
     Returns: List of error messages (empty if valid)
     """
     errors = []
@@ -281,35 +316,46 @@ def validate_srt_file(srt_path):
         return errors
 
     try:
-        with open(srt_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-
-        # Basic validation
-        entries = content.strip().split('\n\n')
-
-        for idx, entry in enumerate(entries, 1):
-            lines = entry.strip().split('\n')
-
-            if len(lines) < 3:
-                errors.append(f"Entry {idx}: Incomplete entry (needs index, timestamp, text)")
-                continue
-
-            # Check index
-            try:
-                index = int(lines[0])
-                if index != idx:
-                    errors.append(f"Entry {idx}: Index mismatch (expected {idx}, got {index})")
-            except ValueError:
-                errors.append(f"Entry {idx}: Invalid index (not a number)")
+        idx = 0
+        block = []
 
-            # Check timestamp format
-            if '-->' not in lines[1]:
-                errors.append(f"Entry {idx}: Invalid timestamp format (missing -->)")
+        with open(srt_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if line:
+                    block.append(line)
+                elif block:
+                    idx += 1
+                    _check_srt_entry(idx, block, errors)
+                    block = []
+
+        if block or idx == 0:
+            idx += 1
+            _check_srt_entry(idx, block, errors)
 
         if not errors:
-            print(f"✅ SRT file is valid: {len(entries)} entries")
+            print(f"✅ SRT file is valid: {idx} entries")
 
     except Exception as e:
         errors.append(f"Error reading file: {str(e)}")
 
     return errors
+
+
+def _check_srt_entry(idx, lines, errors):
+    """Validate one SRT entry (list of non-blank lines), appending to errors."""
+    if len(lines) < 3:
+        errors.append(f"Entry {idx}: Incomplete entry (needs index, timestamp, text)")
+        return
+
+    # Check index
+    try:
+        index = int(lines[0])
+        if index != idx:
+            errors.append(f"Entry {idx}: Index mismatch (expected {idx}, got {index})")
+    except ValueError:
+        errors.append(f"Entry {idx}: Invalid index (not a number)")
+
+    # Check timestamp format
+    if '-->' not in lines[1]:
+        errors.append(f"Entry {idx}: Invalid timestamp format (missing -->)")
@@ -135,11 +135,16 @@ class EDLProcessor:
         self.kickoff_time = kickoff_ts
 
         # Recompute absolute timestamps for events that don't have them
-        for event in self.events:
-            if event.source == "guided" and event.half and event.clock:
-                event.abs_ts = TimeCodeUtils.compute_absolute_time(
-                    event.half, event.clock, kickoff_ts
-                )
+        guided = [event for event in self.events
+                  if event.source == "guided" and event.half and event.clock]
+        if guided:
+            abs_times = TimeCodeUtils.compute_absolute_times_batch(
+                [event.half for event in guided],
+                [event.clock for event in guided],
+                kickoff_ts
+            )
+            for event, abs_ts in zip(guided, abs_times.tolist()):
+                event.abs_ts = abs_ts
 
     def add_auto_detected_events(self, candidates: List[Dict]):
         """Add auto-detected event candidates"""
@@ -362,11 +367,12 @@ class EDLProcessor:
     def export_manifest_data(self) -> List[Dict]:
         """Export events in format suitable for manifest.json"""
         manifest_events = []
+        timestamps = TimeCodeUtils.seconds_to_timestamps([event.abs_ts for event in self.events])
 
-        for event in self.events:
+        for event, timestamp in zip(self.events, timestamps):
             manifest_event = {
                 'type': event.type,
-                'timestamp': TimeCodeUtils.seconds_to_timestamp(event.abs_ts),
+                'timestamp': timestamp,
                 'duration': event.pre_padding + event.post_padding,
                 'team': event.team,
                 'player': event.player,
@@ -2,10 +2,29 @@ import subprocess
 import os
 import cv2
 import numpy as np
-import tempfile
 import shutil
+from functools import lru_cache
+from numpy.lib import recfunctions
 
-def stabilize_clip(input_path, output_path, shakiness=5, accuracy=9, smoothing=10):
+# Structured layout for bulk-loaded action bounding boxes
+BBOX_DTYPE = np.dtype([('t', 'f4'), ('x', 'f4'), ('y', 'f4'), ('w', 'f4'), ('h', 'f4')])
+
+@lru_cache(maxsize=None)
+def cuda_available():
+    """Check (once per process) whether FFmpeg can open a CUDA device for -hwaccel cuda."""
+    try:
+        result = subprocess.run(
+            ['ffmpeg', '-hide_banner', '-v', 'error', '-init_hw_device', 'cuda',
+             '-f', 'lavfi', '-i', 'nullsrc=s=64x64:d=0.1', '-f', 'null', '-'],
+            capture_output=True, timeout=30
+        )
+        return result.returncode == 0
+    except (OSError, subprocess.TimeoutExpired):
+        return False
+
+
+def stabilize_clip(input_path, output_path, shakiness=5, accuracy=9, smoothing=10,
+                   backend='cpu'):
     """
     Stabilize video using vidstab (two-pass).
 
@@ -13,15 +32,22 @@ def stabilize_clip(input_path, output_path, shakiness=5, accuracy=9, smoothing=1
     - shakiness: 1-10 (higher = more stabilization)
     - accuracy: 1-15 (higher = slower but better)
     - smoothing: 0-100 (higher = smoother but may crop more)
+    - backend: 'cpu', or 'cuda' to decode the input on the GPU in both passes
+      (see cuda_available). Only decoding moves to the GPU; vidstab's motion
+      estimation and transform still run on the CPU
 
     Returns: Path to stabilized video
     """
+    if backend not in ('cpu', 'cuda'):
+        raise ValueError(f"Unknown stabilization backend: {backend}")
+
     temp_dir = os.path.dirname(output_path)
     transforms_file = os.path.join(temp_dir, 'transforms.trf')
+    input_args = ['-hwaccel', 'cuda'] if backend == 'cuda' else []
 
     # Pass 1: Detect shakiness
     cmd_detect = [
-        'ffmpeg', '-i', input_path,
+        'ffmpeg', *input_args, '-i', input_path,
         '-vf', f'vidstabdetect=shakiness={shakiness}:accuracy={accuracy}:result={transforms_file}',
         '-f', 'null', '-'
     ]
@@ -31,7 +57,7 @@ def stabilize_clip(input_path, output_path, shakiness=5, accuracy=9, smoothing=1
 
     # Pass 2: Apply stabilization
     cmd_transform = [
-        'ffmpeg', '-i', input_path,
+        'ffmpeg', *input_args, '-i', input_path,
         '-vf', f'vidstabtransform=input={transforms_file}:smoothing={smoothing}:crop=black',
         '-c:a', 'copy',
         '-y', output_path
@@ -47,12 +73,38 @@ def stabilize_clip(input_path, output_path, shakiness=5, accuracy=9, smoothing=1
     return output_path
 
 
+def _nearest_bbox(box_times, boxes, timestamp):
+    """
+    Find the bbox closest in time to timestamp.
+
+    box_times must be sorted ascending; boxes is the matching (N, 5) array
+    of (timestamp, x, y, w, h) rows.
+
+    Returns: ((x, y, w, h), time_diff), or (None, inf) if there are no boxes
+    """
+    if len(box_times) == 0:
+        return None, float('inf')
+
+    idx = int(np.searchsorted(box_times, timestamp))
+    best = None
+    best_diff = float('inf')
+    for i in (idx - 1, idx):
+        if 0 <= i < len(box_times):
+            diff = abs(box_times[i] - timestamp)
+            if diff < best_diff:
+                best, best_diff = i, diff
+
+    x, y, w, h = boxes[best, 1:5]
+    return (x, y, w, h), best_diff
+
+
 def smart_zoom_on_action(input_path, output_path, bbox_data, max_zoom=1.25, ease_duration=0.4):
     """
     Apply smart zoom centered on action (ball/player cluster).
 
     Parameters:
-    - bbox_data: List of (timestamp, x, y, w, h) for action bounding box
+    - bbox_data: List of (timestamp, x, y, w, h) for action bounding box,
+      or a structured array with BBOX_DTYPE fields
     - max_zoom: Maximum zoom factor (1.25 = 25% zoom)
     - ease_duration: Ease in/out duration in seconds
 
@@ -66,6 +118,15 @@ def smart_zoom_on_action(input_path, output_path, bbox_data, max_zoom=1.25, ease
     fourcc = cv2.VideoWriter_fourcc(*'mp4v')
     out = cv2.VideoWriter(output_path, fourcc, fps, (width, height))
 
+    # Sort bboxes by time once so each frame's lookup is a binary search
+    if isinstance(bbox_data, np.ndarray) and bbox_data.dtype.names:
+        boxes = recfunctions.structured_to_unstructured(bbox_data, dtype=np.float64)
+    else:
+        boxes = np.asarray(bbox_data, dtype=np.float64)
+    boxes = boxes.reshape(-1, 5)
+    boxes = boxes[np.argsort(boxes[:, 0], kind='stable')]
+    box_times = boxes[:, 0]
+
     frame_idx = 0
 
     while True:
@@ -76,13 +137,7 @@ def smart_zoom_on_action(input_path, output_path, bbox_data, max_zoom=1.25, ease
         timestamp = frame_idx / fps
 
         # Find closest bbox
-        closest_bbox = None
-        min_time_diff = float('inf')
-        for t, x, y, w, h in bbox_data:
-            time_diff = abs(t - timestamp)
-            if time_diff < min_time_diff:
-                min_time_diff = time_diff
-                closest_bbox = (x, y, w, h)
+        closest_bbox, min_time_diff = _nearest_bbox(box_times, boxes, timestamp)
 
         if closest_bbox and min_time_diff < 1.0:  # Within 1 second
             x, y, w, h = closest_bbox
@@ -121,6 +176,43 @@ def smart_zoom_on_action(input_path, output_path, bbox_data, max_zoom=1.25, ease
     return output_path
 
 
+def _replay_filter_graph(replay_start, replay_end, slowmo_factor, with_stinger=False):
+    """
+    Build the filter graph for add_slowmo_replay.
+
+    Input 0 is split into pre/replay/post parts with trim/atrim, the replay
+    part is slowed down, and everything is joined with the concat filter.
+    When with_stinger is set, input 1 is played before and after the replay.
+
+    Returns: filter_complex string producing [v] and [a]
+    """
+    slowmo_speed = 1.0 / slowmo_factor
+    graph = [
+        '[0:v]split=3[v0][v1][v2]',
+        '[0:a]asplit=3[a0][a1][a2]',
+        f'[v0]trim=end={replay_start},setpts=PTS-STARTPTS[prev]',
+        f'[a0]atrim=end={replay_start},asetpts=PTS-STARTPTS[prea]',
+        f'[v1]trim=start={replay_start}:end={replay_end},setpts={slowmo_speed}*(PTS-STARTPTS)[repv]',
+        f'[a1]atrim=start={replay_start}:end={replay_end},asetpts=PTS-STARTPTS,atempo={slowmo_factor}[repa]',
+        f'[v2]trim=start={replay_end},setpts=PTS-STARTPTS[postv]',
+        f'[a2]atrim=start={replay_end},asetpts=PTS-STARTPTS[posta]',
+    ]
+
+    if with_stinger:
+        graph += [
+            '[1:v]split=2[stinv][stoutv]',
+            '[1:a]asplit=2[stina][stouta]',
+        ]
+        parts = ['pre', 'stin', 'rep', 'stout', 'post']
+    else:
+        parts = ['pre', 'rep', 'post']
+
+    concat_inputs = ''.join(f'[{part}v][{part}a]' for part in parts)
+    graph.append(f'{concat_inputs}concat=n={len(parts)}:v=1:a=1[v][a]')
+
+    return ';'.join(graph)
+
+
 def add_slowmo_replay(input_path, output_path, replay_start, replay_end,
                       slowmo_factor=0.65, stinger_path=None):
     """
@@ -136,56 +228,19 @@ def add_slowmo_replay(input_path, output_path, replay_start, replay_end,
 
     Returns: Path to output video with replay
     """
-    temp_dir = tempfile.mkdtemp()
-
-    # Split video into segments
-    pre_replay = os.path.join(temp_dir, 'pre.mp4')
-    replay_segment = os.path.join(temp_dir, 'replay.mp4')
-    post_replay = os.path.join(temp_dir, 'post.mp4')
-
-    # Extract pre-replay
-    cmd_pre = [
-        'ffmpeg', '-i', input_path, '-ss', '0', '-to', str(replay_start),
-        '-c', 'copy', '-y', pre_replay
-    ]
-    subprocess.run(cmd_pre, check=True, capture_output=True)
-
-    # Extract replay segment with slow-motion
-    slowmo_speed = 1.0 / slowmo_factor
-    cmd_replay = [
-        'ffmpeg', '-i', input_path, '-ss', str(replay_start), '-to', str(replay_end),
-        '-filter_complex', f'[0:v]setpts={slowmo_speed}*PTS[v];[0:a]atempo={slowmo_factor}[a]',
+    with_stinger = bool(stinger_path and os.path.exists(stinger_path))
+
+    # Single ffmpeg pass: trim, slow down and concatenate in one filter graph
+    cmd = ['ffmpeg', '-i', input_path]
+    if with_stinger:
+        cmd += ['-i', stinger_path]
+    cmd += [
+        '-filter_complex', _replay_filter_graph(replay_start, replay_end,
+                                                slowmo_factor, with_stinger),
         '-map', '[v]', '-map', '[a]',
-        '-y', replay_segment
-    ]
-    subprocess.run(cmd_replay, check=True, capture_output=True)
-
-    # Extract post-replay
-    cmd_post = [
-        'ffmpeg', '-i', input_path, '-ss', str(replay_end),
-        '-c', 'copy', '-y', post_replay
-    ]
-    subprocess.run(cmd_post, check=True, capture_output=True)
-
-    # Concatenate segments
-    concat_list = os.path.join(temp_dir, 'concat.txt')
-    with open(concat_list, 'w') as f:
-        f.write(f"file '{pre_replay}'\n")
-        if stinger_path and os.path.exists(stinger_path):
-            f.write(f"file '{stinger_path}'\n")
-        f.write(f"file '{replay_segment}'\n")
-        if stinger_path and os.path.exists(stinger_path):
-            f.write(f"file '{stinger_path}'\n")
-        f.write(f"file '{post_replay}'\n")
-
-    cmd_concat = [
-        'ffmpeg', '-f', 'concat', '-safe', '0', '-i', concat_list,
-        '-c', 'copy', '-y', output_path
+        '-y', output_path
     ]
-    subprocess.run(cmd_concat, check=True, capture_output=True)
-
-    # Cleanup
-    shutil.rmtree(temp_dir)
+    subprocess.run(cmd, check=True, capture_output=True)
 
     return output_path
 
@@ -0,0 +1,47 @@
+"""
+Video encoder selection shared by the rendering modules
+Picks NVENC when a usable NVIDIA GPU is present and x264 otherwise
+"""
+
+import subprocess
+from functools import lru_cache
+
+
+# Both encoders use a fixed 30-frame GOP with no B-frames so outputs seek cheaply when
+# they are cut, probed or re-processed by the next step.
+NVENC_ARGS = ['-c:v', 'h264_nvenc', '-preset', 'p4', '-rc', 'vbr', '-cq', '23',
+              '-g', '30', '-bf', '0']
+X264_ARGS = ['-c:v', 'libx264', '-crf', '18', '-preset', 'medium',
+             '-g', '30', '-keyint_min', '30', '-sc_threshold', '0', '-bf', '0']
+
+
+@lru_cache(maxsize=None)
+def nvenc_available():
+    """Check (once per process) whether FFmpeg can actually encode with NVENC."""
+    try:
+        result = subprocess.run(
+            ['ffmpeg', '-hide_banner', '-v', 'error',
+             '-f', 'lavfi', '-i', 'color=c=black:s=256x256:d=0.1',
+             '-c:v', 'h264_nvenc', '-f', 'null', '-'],
+            capture_output=True, timeout=30
+        )
+        return result.returncode == 0
+    except (OSError, subprocess.TimeoutExpired):
+        return False
+
+
+def get_encoder_args(encoder=None):
+    """
+    Get FFmpeg video encoder arguments.
+
+    Args:
+        encoder: 'nvenc', 'cpu', or None/'auto' to use NVENC when available
+
+    Returns:
+        List of FFmpeg arguments selecting and configuring the encoder
+    """
+    if encoder == 'nvenc':
+        return list(NVENC_ARGS)
+    if encoder == 'cpu':
+        return list(X264_ARGS)
+    return list(NVENC_ARGS if nvenc_available() else X264_ARGS)
@@ -3,6 +3,10 @@ Hashtag automation module for social media optimization
 Automatically generates relevant, trending hashtags for football highlights
 """
 
+# Characters stripped when turning names into hashtags (one str.translate pass)
+_TEAM_TAG_STRIP = str.maketrans('', '', " '-")
+_PLAYER_TAG_STRIP = str.maketrans('', '', " '-.")
+
 
 class HashtagGenerator:
     """
@@ -104,7 +108,7 @@ class HashtagGenerator:
         team = event.get('team') or match_meta.get('home_team')
         if team:
             # Clean team name for hashtag
-            team_tag = team.replace(' ', '').replace("'", '').replace('-', '')
+            team_tag = team.translate(_TEAM_TAG_STRIP)
             hashtags.append(f"#{team_tag}")
 
             # Add nickname if available
@@ -117,7 +121,7 @@ class HashtagGenerator:
         away_team = match_meta.get('away_team')
 
         if home_team and home_team != team:
-            home_tag = home_team.replace(' ', '').replace("'", '').replace('-', '')
+            home_tag = home_team.translate(_TEAM_TAG_STRIP)
             hashtags.append(f"#{home_tag}")
 
             # Add home nickname if available
@@ -126,7 +130,7 @@ class HashtagGenerator:
                 hashtags.append(f"#{home_nickname}")
 
         if away_team and away_team != team:
-            away_tag = away_team.replace(' ', '').replace("'", '').replace('-', '')
+            away_tag = away_team.translate(_TEAM_TAG_STRIP)
             hashtags.append(f"#{away_tag}")
 
             # Add away nickname if available
@@ -138,7 +142,7 @@ class HashtagGenerator:
         player = event.get('player')
         if player:
             # Clean player name
-            player_tag = player.replace(' ', '').replace("'", '').replace('-', '').replace('.', '')
+            player_tag = player.translate(_PLAYER_TAG_STRIP)
             hashtags.append(f"#{player_tag}")
 
         # 4. Competition hashtags
@@ -271,6 +275,9 @@ class HashtagGenerator:
             team_name: Full team name
             nickname: Nickname/abbreviation
         """
+        # Copy on first write so the class-level table is never mutated
+        if 'TEAM_NICKNAMES' not in self.__dict__:
+            self.TEAM_NICKNAMES = dict(self.TEAM_NICKNAMES)
         self.TEAM_NICKNAMES[team_name] = nickname
 
     def get_hashtag_count_by_category(self, hashtags):
@@ -5,8 +5,12 @@ Supports: English, Spanish, Portuguese, French, Arabic, German, Italian, Dutch,
 """
 
 import os
+import re
 from typing import List, Dict, Optional
 
+# One SRT cue: index, time range, caption text, blank separator line
+SRT_ENTRY_TMPL = "{idx}\n{start} --> {end}\n{text}\n\n"
+
 
 class MultiLanguageCaptionGenerator:
     """
@@ -222,6 +226,7 @@ class MultiLanguageCaptionGenerator:
         """
         self.use_api = use_api
         self.translator = None
+        self._phrase_table_cache = {}
 
         if use_api:
             try:
@@ -291,21 +296,59 @@ class MultiLanguageCaptionGenerator:
         Returns:
             Translated text (or original if no phrases match)
         """
-        if target_lang not in self.FOOTBALL_PHRASES:
-            return text_en
+        return self._translate_with_phrases_precomputed(text_en, self._phrase_table(target_lang))
+
+    def _phrase_table(self, target_lang):
+        """
+        Get the compiled phrase table for a language.
 
-        phrases_en = self.FOOTBALL_PHRASES['en']
-        phrases_target = self.FOOTBALL_PHRASES[target_lang]
+        All English phrases are folded into one alternation regex (longest
+        first), so a caption is translated in a single scan rather than one
+        str.replace pass per phrase. Built once per language and cached.
 
-        translated_text = text_en
+        Args:
+            target_lang: Target language code
+
+        Returns:
+            (pattern, replacements) tuple; pattern is None when there is
+            nothing to replace
+        """
+        table = self._phrase_table_cache.get(target_lang)
+        if table is None:
+            replacements = {}
+            if target_lang in self.FOOTBALL_PHRASES:
+                phrases_target = self.FOOTBALL_PHRASES[target_lang]
+                for key, phrase_en in self.FOOTBALL_PHRASES['en'].items():
+                    phrase_target = phrases_target.get(key, phrase_en)
+                    if phrase_target != phrase_en:
+                        replacements[phrase_en] = phrase_target
+
+            pattern = None
+            if replacements:
+                alternation = '|'.join(
+                    re.escape(phrase) for phrase in sorted(replacements, key=len, reverse=True)
+                )
+                pattern = re.compile(alternation)
+
+            table = (pattern, replacements)
+            self._phrase_table_cache[target_lang] = table
+        return table
+
+    def _translate_with_phrases_precomputed(self, text_en, phrase_table):
+        """
+        Translate text with a table from _phrase_table().
 
-        # Replace football phrases
-        for key, phrase_en in phrases_en.items():
-            if phrase_en in translated_text:
-                phrase_target = phrases_target.get(key, phrase_en)
-                translated_text = translated_text.replace(phrase_en, phrase_target)
+        Args:
+            text_en: English text
+            phrase_table: (pattern, replacements) tuple
 
-        return translated_text
+        Returns:
+            Translated text (or original if no phrases match)
+        """
+        pattern, replacements = phrase_table
+        if pattern is None:
+            return text_en
+        return pattern.sub(lambda match: replacements[match.group(0)], text_en)
 
     def generate_multilingual_srt(self, events, match_meta, output_dir, languages=['en', 'es', 'pt']):
         """
@@ -336,26 +379,31 @@ class MultiLanguageCaptionGenerator:
 
             srt_path = os.path.join(output_dir, f'captions_{lang}.srt')
 
+            entries = []
+            for idx, event in enumerate(events, 1):
+                # Generate English caption first
+                caption_en = generate_caption_text(event)
+
+                # Translate if not English
+                if lang != 'en':
+                    caption = self.translate_caption_text(caption_en, lang)
+                else:
+                    caption = caption_en
+
+                start_time = event.get('timestamp', event.get('abs_ts', 0))
+                duration = event.get('duration', 5.0)
+                end_time = start_time + duration
+
+                entries.append(SRT_ENTRY_TMPL.format_map({
+                    'idx': idx,
+                    'start': format_srt_time(start_time),
+                    'end': format_srt_time(end_time),
+                    'text': caption,
+                }))
+
+            # Write the whole file in one go
             with open(srt_path, 'w', encoding='utf-8') as f:
-                for idx, event in enumerate(events, 1):
-                    # Generate English caption first
-                    caption_en = generate_caption_text(event)
-
-                    # Translate if not English
-                    if lang != 'en':
-                        caption = self.translate_caption_text(caption_en, lang)
-                    else:
-                        caption = caption_en
-
-                    # Write SRT entry
-                    start_time = event.get('timestamp', event.get('abs_ts', 0))
-                    duration = event.get('duration', 5.0)
-                    end_time = start_time + duration
-
-                    f.write(f"{idx}\n")
-                    f.write(f"{format_srt_time(start_time)} --> {format_srt_time(end_time)}\n")
-                    f.write(f"{caption}\n")
-                    f.write("\n")
+                f.write(''.join(entries))
 
             srt_files[lang] = srt_path
             print(f"   ✅ {self.SUPPORTED_LANGUAGES.get(lang, lang)}: {srt_path}")
@@ -13,12 +13,45 @@ from hashtag_generator import HashtagGenerator
 from multilang_captions import MultiLanguageCaptionGenerator
 
 
+def _action_centers(bbox_data, timestamps, default_cx):
+    """
+    Horizontal action centre for each timestamp, from the nearest bbox in time.
+
+    Nearest boxes are found with one searchsorted over the time-sorted boxes
+    rather than a scan of every box per frame. Timestamps with no box
+    within 2 seconds get default_cx.
+
+    Returns: int array of centre x positions, one per timestamp
+    """
+    timestamps = np.asarray(timestamps, dtype=np.float64)
+    boxes = np.asarray(bbox_data, dtype=np.float64).reshape(-1, 5)
+
+    order = np.argsort(boxes[:, 0], kind='stable')
+    times = boxes[order, 0]
+    centers = np.trunc(boxes[order, 1] + boxes[order, 3] / 2)
+
+    # Nearest box either side of each timestamp. Among boxes sharing a time
+    # take the first listed, and break distance ties by list position too
+    idx = np.searchsorted(times, timestamps)
+    right = np.clip(idx, 0, len(times) - 1)
+    left = np.clip(idx - 1, 0, len(times) - 1)
+    left = np.searchsorted(times, times[left])
+    left_gap = np.abs(times[left] - timestamps)
+    right_gap = np.abs(times[right] - timestamps)
+    pick_right = (right_gap < left_gap) | ((right_gap == left_gap) & (order[right] < order[left]))
+    nearest = np.where(pick_right, right, left)
+    gap = np.minimum(left_gap, right_gap)
+
+    return np.where(gap < 2.0, centers[nearest], default_cx).astype(np.int64)
+
+
 def smart_crop_to_vertical(input_path, output_path, bbox_data=None, target_res=(1080, 1920)):
     """
     Crop horizontal video (16:9) to vertical (9:16) with smart centering.
 
     Parameters:
-    - bbox_data: List of (timestamp, x, y, w, h) for action bounding boxes
+    - bbox_data: List or (N, 5) array of (timestamp, x, y, w, h) for action
+      bounding boxes
     - target_res: (width, height) for output video
 
     Returns: Path to vertical video
@@ -52,22 +85,28 @@ def smart_crop_to_vertical(input_path, output_path, bbox_data=None, target_res=(
     print(f"  ├─ Original: {orig_width}x{orig_height}")
     print(f"  ├─ Crop region: {crop_width}x{crop_height}")
 
+    # Action centre for every frame, worked out up front. Streams can report
+    # a frame count of -1, in which case every frame is looked up as it comes
+    default_cx = orig_width // 2
+    has_bboxes = bbox_data is not None and len(bbox_data) > 0
+    if has_bboxes:
+        frame_centers = _action_centers(bbox_data, np.arange(max(total_frames, 0)) / fps, default_cx)
+    else:
+        frame_centers = ()
+
     while True:
         ret, frame = cap.read()
         if not ret:
             break
 
-        timestamp = frame_idx / fps
-
-        # Find action center for this timestamp
-        cx = orig_width // 2  # Default to center
-
-        if bbox_data:
-            # Find closest bbox in time
-            closest_bbox = min(bbox_data, key=lambda b: abs(b[0] - timestamp))
-            if abs(closest_bbox[0] - timestamp) < 2.0:  # Within 2 seconds
-                x, y, w, h = closest_bbox[1:]
-                cx = int(x + w / 2)
+        # Find action center for this frame; the frame count reported by the
+        # container can be short, so look up any extra frames individually
+        if frame_idx < len(frame_centers):
+            cx = int(frame_centers[frame_idx])
+        elif has_bboxes:
+            cx = int(_action_centers(bbox_data, [frame_idx / fps], default_cx)[0])
+        else:
+            cx = default_cx
 
         # Calculate crop window centered on action
         crop_x = cx - crop_width // 2
@@ -80,7 +119,7 @@ def smart_crop_to_vertical(input_path, output_path, bbox_data=None, target_res=(
         frame_idx += 1
 
         # Progress indicator
-        if frame_idx % 30 == 0:
+        if frame_idx % 30 == 0 and total_frames > 0:
             progress = (frame_idx / total_frames) * 100
             print(f"  ├─ Progress: {progress:.1f}%", end='\r')
 
@@ -215,6 +254,28 @@ def extract_clip(input_path, start_time, end_time, output_path):
     return output_path
 
 
+def extract_clips(input_path, clips):
+    """
+    Extract several clip segments from one video in a single FFmpeg pass.
+
+    Each clip is its own output of one command, so the source is opened and
+    read through once instead of once per clip. Clips may overlap.
+
+    Parameters:
+    - clips: List of (start_time, end_time, output_path) tuples
+
+    Returns: List of output paths, in the same order as clips
+    """
+    if not clips:
+        return []
+
+    cmd = ['ffmpeg', '-y', '-i', input_path]
+    for start_time, end_time, output_path in clips:
+        cmd += ['-ss', str(start_time), '-to', str(end_time), '-c', 'copy', output_path]
+    subprocess.run(cmd, check=True, capture_output=True)
+    return [output_path for _, _, output_path in clips]
+
+
 def generate_vertical_shorts(events, video_path, match_meta, brand_assets,
                              config, output_dir='out/shorts/'):
     """
@@ -258,15 +319,21 @@ def generate_vertical_shorts(events, video_path, match_meta, brand_assets,
 
     print(f"\n📱 Generating {len(top_events)} vertical shorts...")
 
+    # Extract every clip up front in one pass over the source video
+    clips = [
+        (
+            event.get('start', event.get('abs_ts', 0) - 3),
+            event.get('end', event.get('abs_ts', 0) + 3),
+            os.path.join(output_dir, f'temp_clip_{idx}.mp4'),
+        )
+        for idx, event in enumerate(top_events)
+    ]
+    extract_clips(video_path, clips)
+
     for idx, event in enumerate(top_events):
         print(f"\n📱 Creating vertical short {idx+1}/{len(top_events)}...")
 
-        # Extract clip
-        clip_path = os.path.join(output_dir, f'temp_clip_{idx}.mp4')
-        start = event.get('start', event.get('abs_ts', 0) - 3)
-        end = event.get('end', event.get('abs_ts', 0) + 3)
-
-        extract_clip(video_path, start, end, clip_path)
+        start, end, clip_path = clips[idx]
 
         # Smart crop to vertical
         vertical_path = os.path.join(output_dir, f'temp_vertical_{idx}.mp4')
@@ -5,9 +5,7 @@ Tests all animation effects (pop, slide, bounce, pulse, fade, typewriter)
 """
 
 import argparse
-import os
 import sys
-from pathlib import Path
 
 from animated_text import (
     add_animated_caption,
@@ -16,20 +14,15 @@ from animated_text import (
     test_all_effects,
     EFFECT_LIBRARY
 )
+from tests_common import section, sibling_output, require
 
 
-def test_single_effect(input_path, effect='pop', output_path=None):
+def test_single_effect(input_path, effect='pop', output_path=None, encoder=None):
     """Test a single animation effect"""
-    print("\n" + "="*60)
-    print(f"TESTING {effect.upper()} EFFECT")
-    print("="*60)
-
-    if not os.path.exists(input_path):
-        print(f"Error: Input file not found: {input_path}")
-        return False
+    section(f"TESTING {effect.upper()} EFFECT")
 
     if output_path is None:
-        output_path = input_path.replace('.mp4', f'_{effect}.mp4')
+        output_path = sibling_output(input_path, f'_{effect}')
 
     caption_text = "⚽ GOAL! Mohamed Salah"
 
@@ -52,7 +45,8 @@ def test_single_effect(input_path, effect='pop', output_path=None):
             effect=effect,
             position='bottom',
             duration=5.0,
-            font_size=56
+            font_size=56,
+            encoder=encoder
         )
         print(f"\n✓ Effect test complete: {result}")
         return True
@@ -64,22 +58,16 @@ def test_single_effect(input_path, effect='pop', output_path=None):
         return False
 
 
-def test_all_effects_batch(input_path, output_dir='test_output/animated_text'):
+def test_all_effects_batch(input_path, output_dir='test_output/animated_text', encoder=None):
     """Test all animation effects"""
-    print("\n" + "="*60)
-    print("TESTING ALL ANIMATION EFFECTS")
-    print("="*60)
-
-    if not os.path.exists(input_path):
-        print(f"Error: Input file not found: {input_path}")
-        return False
+    section("TESTING ALL ANIMATION EFFECTS")
 
     print(f"Input: {input_path}")
     print(f"Output directory: {output_dir}")
     print(f"Effects to test: {list(EFFECT_LIBRARY.keys())}")
 
     try:
-        outputs = test_all_effects(input_path, output_dir)
+        outputs = test_all_effects(input_path, output_dir, encoder=encoder)
 
         print(f"\n✓ All effects tested successfully!")
         print(f"  Generated {len(outputs)} test videos:")
@@ -95,18 +83,12 @@ def test_all_effects_batch(input_path, output_dir='test_output/animated_text'):
         return False
 
 
-def test_event_caption(input_path, event_type='goal', output_path=None):
+def test_event_caption(input_path, event_type='goal', output_path=None, encoder=None):
     """Test event-based caption with auto effect selection"""
-    print("\n" + "="*60)
-    print(f"TESTING EVENT CAPTION ({event_type.upper()})")
-    print("="*60)
-
-    if not os.path.exists(input_path):
-        print(f"Error: Input file not found: {input_path}")
-        return False
+    section(f"TESTING EVENT CAPTION ({event_type.upper()})")
 
     if output_path is None:
-        output_path = input_path.replace('.mp4', f'_event_{event_type}.mp4')
+        output_path = sibling_output(input_path, f'_event_{event_type}')
 
     # Sample event data
     events = {
@@ -153,7 +135,8 @@ def test_event_caption(input_path, event_type='goal', output_path=None):
             input_path,
             output_path,
             event,
-            effect='auto'  # Auto-select based on event type
+            effect='auto',  # Auto-select based on event type
+            encoder=encoder
         )
         print(f"\n✓ Event caption test complete: {result}")
         return True
@@ -167,9 +150,7 @@ def test_event_caption(input_path, event_type='goal', output_path=None):
 
 def test_effect_info():
     """Test effect info retrieval"""
-    print("\n" + "="*60)
-    print("EFFECT LIBRARY INFORMATION")
-    print("="*60)
+    section("EFFECT LIBRARY INFORMATION")
 
     effect_info = get_effect_info()
 
@@ -201,9 +182,19 @@ def main():
                        help='Event type to test (for event test)')
     parser.add_argument('--output-dir', default='test_output/animated_text',
                        help='Output directory (for all test)')
+    parser.add_argument('--encoder', default='auto', choices=['auto', 'cpu', 'nvenc'],
+                       help='Video encoder (auto uses NVENC when available)')
 
     args = parser.parse_args()
 
+    # Check the input once up front instead of in every test
+    if args.input and args.test != 'info':
+        try:
+            require(args.input, 'Input')
+        except FileNotFoundError as e:
+            print(e)
+            sys.exit(1)
+
     success = True
 
     if args.test == 'info':
@@ -214,28 +205,23 @@ def main():
             print("Error: --input argument required for single test")
             success = False
         else:
-            success = test_single_effect(args.input, args.effect, args.output)
+            success = test_single_effect(args.input, args.effect, args.output, args.encoder)
 
     elif args.test == 'all':
         if not args.input:
             print("Error: --input argument required for all test")
             success = False
         else:
-            success = test_all_effects_batch(args.input, args.output_dir)
+            success = test_all_effects_batch(args.input, args.output_dir, args.encoder)
 
     elif args.test == 'event':
         if not args.input:
             print("Error: --input argument required for event test")
             success = False
         else:
-            success = test_event_caption(args.input, args.event_type, args.output)
-
-    print("\n" + "="*60)
-    if success:
-        print("✓ ALL TESTS PASSED")
-    else:
-        print("✗ SOME TESTS FAILED")
-    print("="*60)
+            success = test_event_caption(args.input, args.event_type, args.output, args.encoder)
+
+    section("✓ ALL TESTS PASSED" if success else "✗ SOME TESTS FAILED")
 
     sys.exit(0 if success else 1)
 
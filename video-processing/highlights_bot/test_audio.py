@@ -7,7 +7,7 @@ Tests loudness normalization, ducking, limiting, and full audio chain
 import argparse
 import os
 import sys
-from pathlib import Path
+import tempfile
 
 from audio import (
     normalize_loudness,
@@ -16,22 +16,18 @@ from audio import (
     add_audio_fade,
     mix_audio_tracks,
     extract_audio_info,
-    apply_professional_audio_chain
+    apply_professional_audio_chain,
+    decode_audio
 )
+from tests_common import section, task_output, run_tasks, sibling_output, require
 
 
-def test_normalize(input_path, output_path=None, target_lufs=-14.0):
+def test_normalize(input_path, output_path=None, target_lufs=-14.0, audio_src=None):
     """Test loudness normalization"""
-    print("\n" + "="*60)
-    print("TESTING LOUDNESS NORMALIZATION")
-    print("="*60)
-
-    if not os.path.exists(input_path):
-        print(f"Error: Input file not found: {input_path}")
-        return False
+    section("TESTING LOUDNESS NORMALIZATION")
 
     if output_path is None:
-        output_path = input_path.replace('.mp4', '_normalized.mp4')
+        output_path = sibling_output(input_path, '_normalized')
 
     print(f"Input: {input_path}")
     print(f"Output: {output_path}")
@@ -49,7 +45,8 @@ def test_normalize(input_path, output_path=None, target_lufs=-14.0):
                 print(f"  Bit rate: {info['bit_rate']/1000:.1f} kbps")
 
         # Normalize
-        result = normalize_loudness(input_path, output_path, target_lufs=target_lufs)
+        result = normalize_loudness(input_path, output_path, target_lufs=target_lufs,
+                                    audio_src=audio_src)
         print(f"\n✓ Normalization complete: {result}")
 
         # Get normalized audio info
@@ -71,18 +68,12 @@ def test_normalize(input_path, output_path=None, target_lufs=-14.0):
         return False
 
 
-def test_duck(input_path, output_path=None, times_str="5-8,15-18"):
+def test_duck(input_path, output_path=None, times_str="5-8,15-18", audio_src=None):
     """Test audio ducking"""
-    print("\n" + "="*60)
-    print("TESTING AUDIO DUCKING")
-    print("="*60)
-
-    if not os.path.exists(input_path):
-        print(f"Error: Input file not found: {input_path}")
-        return False
+    section("TESTING AUDIO DUCKING")
 
     if output_path is None:
-        output_path = input_path.replace('.mp4', '_ducked.mp4')
+        output_path = sibling_output(input_path, '_ducked')
 
     # Parse times string (format: "5-8,15-18")
     overlay_times = []
@@ -99,7 +90,8 @@ def test_duck(input_path, output_path=None, times_str="5-8,15-18"):
         result = duck_audio_during_overlays(
             input_path, output_path,
             overlay_times,
-            duck_amount_db=-3.0
+            duck_amount_db=-3.0,
+            audio_src=audio_src
         )
         print(f"\n✓ Ducking complete: {result}")
         return True
@@ -111,25 +103,20 @@ def test_duck(input_path, output_path=None, times_str="5-8,15-18"):
         return False
 
 
-def test_limiter(input_path, output_path=None, threshold=-2.0):
+def test_limiter(input_path, output_path=None, threshold=-2.0, audio_src=None):
     """Test peak limiter"""
-    print("\n" + "="*60)
-    print("TESTING PEAK LIMITER")
-    print("="*60)
-
-    if not os.path.exists(input_path):
-        print(f"Error: Input file not found: {input_path}")
-        return False
+    section("TESTING PEAK LIMITER")
 
     if output_path is None:
-        output_path = input_path.replace('.mp4', '_limited.mp4')
+        output_path = sibling_output(input_path, '_limited')
 
     print(f"Input: {input_path}")
     print(f"Output: {output_path}")
     print(f"Threshold: {threshold} dB")
 
     try:
-        result = apply_peak_limiter(input_path, output_path, threshold_db=threshold)
+        result = apply_peak_limiter(input_path, output_path, threshold_db=threshold,
+                                    audio_src=audio_src)
         print(f"\n✓ Peak limiting complete: {result}")
         return True
 
@@ -140,25 +127,19 @@ def test_limiter(input_path, output_path=None, threshold=-2.0):
         return False
 
 
-def test_fade(input_path, output_path=None, fade_in=0.5, fade_out=1.0):
+def test_fade(input_path, output_path=None, fade_in=0.5, fade_out=1.0, audio_src=None):
     """Test audio fades"""
-    print("\n" + "="*60)
-    print("TESTING AUDIO FADES")
-    print("="*60)
-
-    if not os.path.exists(input_path):
-        print(f"Error: Input file not found: {input_path}")
-        return False
+    section("TESTING AUDIO FADES")
 
     if output_path is None:
-        output_path = input_path.replace('.mp4', '_faded.mp4')
+        output_path = sibling_output(input_path, '_faded')
 
     print(f"Input: {input_path}")
     print(f"Output: {output_path}")
     print(f"Fade in: {fade_in}s, Fade out: {fade_out}s")
 
     try:
-        result = add_audio_fade(input_path, output_path, fade_in, fade_out)
+        result = add_audio_fade(input_path, output_path, fade_in, fade_out, audio_src=audio_src)
         print(f"\n✓ Audio fades complete: {result}")
         return True
 
@@ -171,20 +152,10 @@ def test_fade(input_path, output_path=None, fade_in=0.5, fade_out=1.0):
 
 def test_mix(video_path, music_path, output_path=None, video_vol=1.0, music_vol=0.3):
     """Test audio mixing"""
-    print("\n" + "="*60)
-    print("TESTING AUDIO MIXING")
-    print("="*60)
-
-    if not os.path.exists(video_path):
-        print(f"Error: Video file not found: {video_path}")
-        return False
-
-    if not os.path.exists(music_path):
-        print(f"Error: Music file not found: {music_path}")
-        return False
+    section("TESTING AUDIO MIXING")
 
     if output_path is None:
-        output_path = video_path.replace('.mp4', '_mixed.mp4')
+        output_path = sibling_output(video_path, '_mixed')
 
     print(f"Video: {video_path}")
     print(f"Music: {music_path}")
@@ -203,18 +174,12 @@ def test_mix(video_path, music_path, output_path=None, video_vol=1.0, music_vol=
         return False
 
 
-def test_professional_chain(input_path, output_path=None):
+def test_professional_chain(input_path, output_path=None, audio_src=None):
     """Test complete professional audio chain"""
-    print("\n" + "="*60)
-    print("TESTING PROFESSIONAL AUDIO CHAIN")
-    print("="*60)
-
-    if not os.path.exists(input_path):
-        print(f"Error: Input file not found: {input_path}")
-        return False
+    section("TESTING PROFESSIONAL AUDIO CHAIN")
 
     if output_path is None:
-        output_path = input_path.replace('.mp4', '_pro_audio.mp4')
+        output_path = sibling_output(input_path, '_pro_audio')
 
     print(f"Input: {input_path}")
     print(f"Output: {output_path}")
@@ -233,7 +198,7 @@ def test_professional_chain(input_path, output_path=None):
     print(f"  3. Fades: {config['fade_in']}s in, {config['fade_out']}s out")
 
     try:
-        result = apply_professional_audio_chain(input_path, output_path, config)
+        result = apply_professional_audio_chain(input_path, output_path, config, audio_src=audio_src)
         print(f"\n✓ Professional audio chain complete: {result}")
         return True
 
@@ -246,13 +211,7 @@ def test_professional_chain(input_path, output_path=None):
 
 def test_info(input_path):
     """Test audio info extraction"""
-    print("\n" + "="*60)
-    print("TESTING AUDIO INFO EXTRACTION")
-    print("="*60)
-
-    if not os.path.exists(input_path):
-        print(f"Error: Input file not found: {input_path}")
-        return False
+    section("TESTING AUDIO INFO EXTRACTION")
 
     print(f"Input: {input_path}")
 
@@ -297,39 +256,70 @@ def main():
 
     args = parser.parse_args()
 
-    success = True
-
-    if args.test == 'normalize' or args.test == 'all':
-        success = test_normalize(args.input, args.output, args.lufs) and success
-
-    if args.test == 'duck' or args.test == 'all':
-        success = test_duck(args.input, args.output, args.times) and success
-
-    if args.test == 'limiter' or args.test == 'all':
-        success = test_limiter(args.input, args.output, args.threshold) and success
-
-    if args.test == 'fade' or args.test == 'all':
-        success = test_fade(args.input, args.output, args.fade_in, args.fade_out) and success
+    # Check each input once up front instead of in every test
+    required = {args.input: 'Input'}
+    if args.music and args.test in ('mix', 'all'):
+        required.setdefault(args.music, 'Music')
+    try:
+        for path, label in required.items():
+            require(path, label)
+    except FileNotFoundError as e:
+        print(e)
+        sys.exit(1)
 
-    if args.test == 'mix' or args.test == 'all':
+    success = True
+    run_all = args.test == 'all'
+    tasks = []
+
+    def output_for(name):
+        return task_output(args.output, name, run_all)
+
+    # Under --test all, decode the input's audio once and share it
+    audio_src = None
+    if run_all:
+        audio_src = os.path.join(tempfile.gettempdir(), f'test_audio_src_{os.getpid()}.wav')
+        try:
+            decode_audio(args.input, audio_src)
+        except Exception as e:
+            print(f"Warning: shared audio decode failed, tests will decode separately: {e}")
+            audio_src = None
+
+    if args.test == 'normalize' or run_all:
+        tasks.append(('normalize', test_normalize,
+                      (args.input, output_for('normalize'), args.lufs, audio_src)))
+
+    if args.test == 'duck' or run_all:
+        tasks.append(('duck', test_duck, (args.input, output_for('duck'), args.times, audio_src)))
+
+    if args.test == 'limiter' or run_all:
+        tasks.append(('limiter', test_limiter,
+                      (args.input, output_for('limiter'), args.threshold, audio_src)))
+
+    if args.test == 'fade' or run_all:
+        tasks.append(('fade', test_fade,
+                      (args.input, output_for('fade'), args.fade_in, args.fade_out, audio_src)))
+
+    if args.test == 'mix' or run_all:
         if args.music:
-            success = test_mix(args.input, args.music, args.output, args.video_vol, args.music_vol) and success
+            tasks.append(('mix', test_mix, (args.input, args.music, output_for('mix'),
+                                            args.video_vol, args.music_vol)))
         elif args.test == 'mix':
             print("Error: --music argument required for mix test")
             success = False
 
-    if args.test == 'chain' or args.test == 'all':
-        success = test_professional_chain(args.input, args.output) and success
+    if args.test == 'chain' or run_all:
+        tasks.append(('chain', test_professional_chain, (args.input, output_for('chain'), audio_src)))
+
+    if args.test == 'info' or run_all:
+        tasks.append(('info', test_info, (args.input,)))
 
-    if args.test == 'info' or args.test == 'all':
-        success = test_info(args.input) and success
+    try:
+        success = all(run_tasks(tasks, parallel=run_all)) and success
+    finally:
+        if audio_src and os.path.exists(audio_src):
+            os.remove(audio_src)
 
-    print("\n" + "="*60)
-    if success:
-        print("✓ ALL TESTS PASSED")
-    else:
-        print("✗ SOME TESTS FAILED")
-    print("="*60)
+    section("✓ ALL TESTS PASSED" if success else "✗ SOME TESTS FAILED")
 
     sys.exit(0 if success else 1)
 
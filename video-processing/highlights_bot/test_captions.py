@@ -7,8 +7,6 @@ Tests caption generation, validation, and video burn-in
 import argparse
 import os
 import sys
-import json
-from pathlib import Path
 
 from captions import (
     format_srt_time,
@@ -19,13 +17,12 @@ from captions import (
     add_auto_captions,
     validate_srt_file
 )
+from tests_common import load_json, section, task_output, run_tasks, sibling_output, require
 
 
 def test_format_time():
     """Test SRT time formatting"""
-    print("\n" + "="*60)
-    print("TESTING SRT TIME FORMATTING")
-    print("="*60)
+    section("TESTING SRT TIME FORMATTING")
 
     test_cases = [
         (0, "00:00:00,000"),
@@ -53,13 +50,7 @@ def test_format_time():
 
 def test_generate_srt(events_file, output_path=None):
     """Test SRT generation from events"""
-    print("\n" + "="*60)
-    print("TESTING SRT GENERATION")
-    print("="*60)
-
-    if not os.path.exists(events_file):
-        print(f"Error: Events file not found: {events_file}")
-        return False
+    section("TESTING SRT GENERATION")
 
     if output_path is None:
         output_path = 'test_output/captions.srt'
@@ -67,8 +58,7 @@ def test_generate_srt(events_file, output_path=None):
     os.makedirs(os.path.dirname(output_path), exist_ok=True)
 
     # Load events
-    with open(events_file, 'r') as f:
-        events = json.load(f)
+    events = load_json(events_file)
 
     # Match metadata
     match_meta = {
@@ -101,13 +91,7 @@ def test_generate_srt(events_file, output_path=None):
 
 def test_validate_srt(srt_path):
     """Test SRT validation"""
-    print("\n" + "="*60)
-    print("TESTING SRT VALIDATION")
-    print("="*60)
-
-    if not os.path.exists(srt_path):
-        print(f"Error: SRT file not found: {srt_path}")
-        return False
+    section("TESTING SRT VALIDATION")
 
     print(f"SRT file: {srt_path}")
 
@@ -130,18 +114,12 @@ def test_validate_srt(srt_path):
         return False
 
 
-def test_burn_caption_text(input_path, output_path=None):
+def test_burn_caption_text(input_path, output_path=None, encoder=None):
     """Test burning text caption into video"""
-    print("\n" + "="*60)
-    print("TESTING TEXT CAPTION BURN-IN")
-    print("="*60)
-
-    if not os.path.exists(input_path):
-        print(f"Error: Input file not found: {input_path}")
-        return False
+    section("TESTING TEXT CAPTION BURN-IN")
 
     if output_path is None:
-        output_path = input_path.replace('.mp4', '_with_caption.mp4')
+        output_path = sibling_output(input_path, '_with_caption')
 
     caption_text = "⚽ GOAL! Mohamed Salah (67')"
 
@@ -155,7 +133,8 @@ def test_burn_caption_text(input_path, output_path=None):
             caption_text,
             position='top',
             duration=5.0,
-            font_size=48
+            font_size=48,
+            encoder=encoder
         )
         print(f"\n✓ Text caption burned: {result}")
         return True
@@ -167,29 +146,21 @@ def test_burn_caption_text(input_path, output_path=None):
         return False
 
 
-def test_burn_srt(input_path, srt_path, output_path=None):
+def test_burn_srt(input_path, srt_path, output_path=None, encoder=None, soft=False):
     """Test burning SRT file into video"""
-    print("\n" + "="*60)
-    print("TESTING SRT FILE BURN-IN")
-    print("="*60)
-
-    if not os.path.exists(input_path):
-        print(f"Error: Input file not found: {input_path}")
-        return False
-
-    if not os.path.exists(srt_path):
-        print(f"Error: SRT file not found: {srt_path}")
-        return False
+    section("TESTING SRT FILE BURN-IN")
 
     if output_path is None:
-        output_path = input_path.replace('.mp4', '_with_srt.mp4')
+        output_path = sibling_output(input_path, '_with_srt')
 
     print(f"Input: {input_path}")
     print(f"SRT: {srt_path}")
     print(f"Output: {output_path}")
+    print(f"Mode: {'soft subtitle track' if soft else 'burned in'}")
 
     try:
-        result = burn_srt_file(input_path, output_path, srt_path, font_size=24)
+        result = burn_srt_file(input_path, output_path, srt_path, font_size=24,
+                               encoder=encoder, hard_burn=not soft)
         print(f"\n✓ SRT burned into video: {result}")
         return True
 
@@ -202,9 +173,7 @@ def test_burn_srt(input_path, srt_path, output_path=None):
 
 def test_caption_text_generation():
     """Test caption text generation for various event types"""
-    print("\n" + "="*60)
-    print("TESTING CAPTION TEXT GENERATION")
-    print("="*60)
+    section("TESTING CAPTION TEXT GENERATION")
 
     test_events = [
         {'type': 'goal', 'player': 'Mohamed Salah', 'team': 'Liverpool'},
@@ -224,33 +193,22 @@ def test_caption_text_generation():
     return success
 
 
-def test_auto_captions(input_path, events_file, output_path=None):
+def test_auto_captions(input_path, events_file, output_path=None, encoder=None):
     """Test automatic captions"""
-    print("\n" + "="*60)
-    print("TESTING AUTO CAPTIONS")
-    print("="*60)
-
-    if not os.path.exists(input_path):
-        print(f"Error: Input file not found: {input_path}")
-        return False
-
-    if not os.path.exists(events_file):
-        print(f"Error: Events file not found: {events_file}")
-        return False
+    section("TESTING AUTO CAPTIONS")
 
     if output_path is None:
-        output_path = input_path.replace('.mp4', '_auto_captions.mp4')
+        output_path = sibling_output(input_path, '_auto_captions')
 
     # Load events
-    with open(events_file, 'r') as f:
-        events = json.load(f)
+    events = load_json(events_file)
 
     print(f"Input: {input_path}")
     print(f"Events: {events_file} ({len(events)} events)")
     print(f"Output: {output_path}")
 
     try:
-        result = add_auto_captions(input_path, output_path, events, style='modern')
+        result = add_auto_captions(input_path, output_path, events, style='modern', encoder=encoder)
         print(f"\n✓ Auto captions added: {result}")
         return True
 
@@ -271,58 +229,87 @@ def main():
     parser.add_argument('--srt', help='SRT file path')
     parser.add_argument('--input', help='Input video file')
     parser.add_argument('--output', help='Output file (optional)')
+    parser.add_argument('--encoder', default='auto', choices=['auto', 'cpu', 'nvenc'],
+                       help='Video encoder (auto uses NVENC when available)')
+    parser.add_argument('--soft', action='store_true',
+                       help='Mux SRT as a soft subtitle track instead of burning it in (burn-srt test)')
 
     args = parser.parse_args()
 
+    # Check each supplied input once up front instead of in every test.
+    # Under --test all with --events, the generate step may write --srt
+    # itself, so it is not checked here
+    run_all = args.test == 'all'
+    srt_input = None if run_all and args.events else args.srt
+    required = {}
+    for path, label in ((args.input, 'Input'), (args.events, 'Events'), (srt_input, 'SRT')):
+        if path:
+            required.setdefault(path, label)
+    try:
+        for path, label in required.items():
+            require(path, label)
+    except FileNotFoundError as e:
+        print(e)
+        sys.exit(1)
+
     success = True
+    tasks = []
+
+    def output_for(name):
+        return task_output(args.output, name, run_all)
 
-    if args.test == 'format' or args.test == 'all':
-        success = test_format_time() and success
+    if args.test == 'format' or run_all:
+        tasks.append(('format', test_format_time, ()))
 
-    if args.test == 'generate' or args.test == 'all':
+    if args.test == 'generate' or run_all:
         if args.events:
-            success = test_generate_srt(args.events, args.output) and success
+            tasks.append(('generate', test_generate_srt, (args.events, output_for('generate'))))
         elif args.test == 'generate':
             print("Error: --events argument required for generate test")
             success = False
 
-    if args.test == 'validate' or args.test == 'all':
+    if args.test == 'validate' or run_all:
         if args.srt:
-            success = test_validate_srt(args.srt) and success
+            tasks.append(('validate', test_validate_srt, (args.srt,)))
         elif args.test == 'validate':
             print("Error: --srt argument required for validate test")
             success = False
 
-    if args.test == 'burn-text' or args.test == 'all':
+    if args.test == 'burn-text' or run_all:
         if args.input:
-            success = test_burn_caption_text(args.input, args.output) and success
+            tasks.append(('burn-text', test_burn_caption_text,
+                          (args.input, output_for('burn_text'), args.encoder)))
         elif args.test == 'burn-text':
             print("Error: --input argument required for burn-text test")
             success = False
 
-    if args.test == 'burn-srt' or args.test == 'all':
+    if args.test == 'burn-srt' or run_all:
         if args.input and args.srt:
-            success = test_burn_srt(args.input, args.srt, args.output) and success
+            tasks.append(('burn-srt', test_burn_srt,
+                          (args.input, args.srt, output_for('burn_srt'), args.encoder, args.soft)))
         elif args.test == 'burn-srt':
             print("Error: --input and --srt arguments required for burn-srt test")
             success = False
 
-    if args.test == 'caption-text' or args.test == 'all':
-        success = test_caption_text_generation() and success
+    if args.test == 'caption-text' or run_all:
+        tasks.append(('caption-text', test_caption_text_generation, ()))
 
-    if args.test == 'auto' or args.test == 'all':
+    if args.test == 'auto' or run_all:
         if args.input and args.events:
-            success = test_auto_captions(args.input, args.events, args.output) and success
+            tasks.append(('auto', test_auto_captions,
+                          (args.input, args.events, output_for('auto'), args.encoder)))
         elif args.test == 'auto':
             print("Error: --input and --events arguments required for auto test")
             success = False
 
-    print("\n" + "="*60)
-    if success:
-        print("✓ ALL TESTS PASSED")
-    else:
-        print("✗ SOME TESTS FAILED")
-    print("="*60)
+    # generate writes the SRT that validate/burn-srt may read, so it finishes
+    # before the rest of the tests start
+    first = [task for task in tasks if task[0] == 'generate']
+    rest = [task for task in tasks if task[0] != 'generate']
+    results = run_tasks(first, parallel=False) + run_tasks(rest, parallel=run_all)
+    success = all(results) and success
+
+    section("✓ ALL TESTS PASSED" if success else "✗ SOME TESTS FAILED")
 
     sys.exit(0 if success else 1)
 
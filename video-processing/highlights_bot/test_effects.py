@@ -6,10 +6,11 @@ Test script for video effects (stabilization, smart zoom, slow-motion replays)
 import argparse
 import os
 import sys
-import json
-from pathlib import Path
 
-from effects import stabilize_clip, smart_zoom_on_action, add_slowmo_replay
+import numpy as np
+
+from effects import BBOX_DTYPE, cuda_available, stabilize_clip, smart_zoom_on_action, add_slowmo_replay
+from tests_common import load_json, section, task_output, run_tasks, sibling_output
 
 
 def test_stabilization(input_path, output_path=None):
@@ -19,14 +20,15 @@ def test_stabilization(input_path, output_path=None):
         return False
 
     if output_path is None:
-        output_path = input_path.replace('.mp4', '_stabilized.mp4')
+        output_path = sibling_output(input_path, '_stabilized')
 
-    print(f"Testing stabilization...")
-    print(f"Input: {input_path}")
-    print(f"Output: {output_path}")
+    backend = 'cuda' if cuda_available() else 'cpu'
+    section("TESTING STABILIZATION",
+            f"Input: {input_path}", f"Output: {output_path}", f"Backend: {backend}")
 
     try:
-        result = stabilize_clip(input_path, output_path, shakiness=5, accuracy=9, smoothing=10)
+        result = stabilize_clip(input_path, output_path, shakiness=5, accuracy=9, smoothing=10,
+                                backend=backend)
         print(f"✓ Stabilization complete: {result}")
         return True
     except Exception as e:
@@ -45,29 +47,28 @@ def test_smart_zoom(input_path, bbox_file, output_path=None):
         return False
 
     if output_path is None:
-        output_path = input_path.replace('.mp4', '_zoomed.mp4')
+        output_path = sibling_output(input_path, '_zoomed')
 
-    print(f"Testing smart zoom...")
-    print(f"Input: {input_path}")
-    print(f"Bbox data: {bbox_file}")
-    print(f"Output: {output_path}")
+    section("TESTING SMART ZOOM",
+            f"Input: {input_path}", f"Bbox data: {bbox_file}", f"Output: {output_path}")
 
     # Load bbox data
     try:
-        with open(bbox_file, 'r') as f:
-            bbox_data = json.load(f)
+        bbox_data = load_json(bbox_file)
 
-        # Convert to expected format: [(timestamp, x, y, w, h), ...]
+        # Convert to expected format: [(timestamp, x, y, w, h), ...] or a
+        # BBOX_DTYPE structured array
         if isinstance(bbox_data, list) and len(bbox_data) > 0:
             # If already in correct format
             if isinstance(bbox_data[0], (list, tuple)) and len(bbox_data[0]) == 5:
                 pass
             # If in dict format
             elif isinstance(bbox_data[0], dict):
-                bbox_data = [
-                    (item['timestamp'], item['x'], item['y'], item['w'], item['h'])
-                    for item in bbox_data
-                ]
+                bbox_data = np.fromiter(
+                    ((item['timestamp'], item['x'], item['y'], item['w'], item['h'])
+                     for item in bbox_data),
+                    dtype=BBOX_DTYPE, count=len(bbox_data)
+                )
 
         result = smart_zoom_on_action(input_path, output_path, bbox_data, max_zoom=1.25)
         print(f"✓ Smart zoom complete: {result}")
@@ -86,12 +87,11 @@ def test_replay(input_path, start_time, end_time, output_path=None, stinger_path
         return False
 
     if output_path is None:
-        output_path = input_path.replace('.mp4', '_replay.mp4')
+        output_path = sibling_output(input_path, '_replay')
 
-    print(f"Testing slow-motion replay...")
-    print(f"Input: {input_path}")
-    print(f"Replay segment: {start_time}s to {end_time}s")
-    print(f"Output: {output_path}")
+    section("TESTING SLOW-MOTION REPLAY",
+            f"Input: {input_path}", f"Replay segment: {start_time}s to {end_time}s",
+            f"Output: {output_path}")
 
     try:
         result = add_slowmo_replay(
@@ -124,39 +124,33 @@ def main():
     args = parser.parse_args()
 
     success = True
+    run_all = args.test == 'all'
+    tasks = []
+
+    def output_for(name):
+        return task_output(args.output, name, run_all)
 
-    if args.test == 'stabilize' or args.test == 'all':
-        print("\n" + "="*60)
-        print("TESTING STABILIZATION")
-        print("="*60)
-        success = test_stabilization(args.input, args.output) and success
+    if args.test == 'stabilize' or run_all:
+        tasks.append(('stabilize', test_stabilization, (args.input, output_for('stabilized'))))
 
-    if args.test == 'zoom' or args.test == 'all':
-        print("\n" + "="*60)
-        print("TESTING SMART ZOOM")
-        print("="*60)
+    if args.test == 'zoom' or run_all:
         if not args.bbox:
             print("Error: --bbox argument required for zoom test")
             success = False
         else:
-            success = test_smart_zoom(args.input, args.bbox, args.output) and success
+            tasks.append(('zoom', test_smart_zoom, (args.input, args.bbox, output_for('zoomed'))))
 
-    if args.test == 'replay' or args.test == 'all':
-        print("\n" + "="*60)
-        print("TESTING SLOW-MOTION REPLAY")
-        print("="*60)
+    if args.test == 'replay' or run_all:
         if args.start is None or args.end is None:
             print("Error: --start and --end arguments required for replay test")
             success = False
         else:
-            success = test_replay(args.input, args.start, args.end, args.output, args.stinger) and success
-
-    print("\n" + "="*60)
-    if success:
-        print("✓ ALL TESTS PASSED")
-    else:
-        print("✗ SOME TESTS FAILED")
-    print("="*60)
+            tasks.append(('replay', test_replay,
+                          (args.input, args.start, args.end, output_for('replay'), args.stinger)))
+
+    success = all(run_tasks(tasks, parallel=run_all)) and success
+
+    section("✓ ALL TESTS PASSED" if success else "✗ SOME TESTS FAILED")
 
     sys.exit(0 if success else 1)
 
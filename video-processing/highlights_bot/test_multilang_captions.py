@@ -5,20 +5,59 @@ Tests translation to Spanish, Portuguese, French, Arabic, German, Italian, etc.
 """
 
 import argparse
+import contextlib
+import io
+import itertools
 import sys
 import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
 from pathlib import Path
 
 from multilang_captions import MultiLanguageCaptionGenerator
+from tests_common import BANNER, RULE, buffered_output, run_captured, section
 
 
+@lru_cache(maxsize=1)
+def _get_generator():
+    """Shared phrase-based generator (no API) used by every test"""
+    return MultiLanguageCaptionGenerator(use_api=False)
+
+
+@lru_cache(maxsize=4096)
+def _tr(text, lang):
+    """Memoized translate_caption_text; tests re-translate the same captions"""
+    return _get_generator().translate_caption_text(text, lang)
+
+
+def _warm_caches():
+    """
+    Build the shared generator and every language's phrase table up front.
+
+    Called before starting a process pool so forked workers inherit the
+    warmed caches instead of each rebuilding them.
+    """
+    generator = _get_generator()
+    for lang in generator.FOOTBALL_PHRASES:
+        generator._phrase_table(lang)
+
+
+def _render_one_lang_srt(events, match_meta, output_dir, lang):
+    """Worker: write one language's SRT, returning (lang, path, captured log)"""
+    buf = io.StringIO()
+    with contextlib.redirect_stdout(buf):
+        srt_files = _get_generator().generate_multilingual_srt(
+            events, match_meta, output_dir, languages=[lang]
+        )
+    return lang, srt_files[lang], buf.getvalue()
+
+
+@buffered_output
 def test_translation(languages=['es', 'pt', 'fr']):
     """Test translation of various caption texts"""
-    print("\n" + "="*60)
-    print("TESTING CAPTION TRANSLATION")
-    print("="*60)
+    section("TESTING CAPTION TRANSLATION")
 
-    generator = MultiLanguageCaptionGenerator(use_api=False)  # Phrase-based only
+    generator = _get_generator()  # Phrase-based only
 
     # Test captions
     test_captions = [
@@ -30,25 +69,33 @@ def test_translation(languages=['es', 'pt', 'fr']):
         "🎯 Big Chance - Harry Kane 12'",
     ]
 
+    lang_names = {lang: generator.SUPPORTED_LANGUAGES.get(lang, lang) for lang in languages}
+
+    # Translate one language at a time so its phrase table is fetched once
+    translations = {}
+    for lang in languages:
+        phrase_table = generator._phrase_table(lang)
+        for caption_en in test_captions:
+            translations[caption_en, lang] = generator._translate_with_phrases_precomputed(
+                caption_en, phrase_table
+            )
+
     for caption_en in test_captions:
         print(f"\n📝 Original (English): {caption_en}")
-        print("-" * 60)
+        print(RULE)
 
         for lang in languages:
-            translated = generator.translate_caption_text(caption_en, lang)
-            lang_name = generator.SUPPORTED_LANGUAGES.get(lang, lang)
-            print(f"  {lang_name:20s}: {translated}")
+            print(f"  {lang_names[lang]:20s}: {translations[caption_en, lang]}")
 
     return True
 
 
+@buffered_output
 def test_phrase_detection():
     """Test football-specific phrase detection and translation"""
-    print("\n" + "="*60)
-    print("TESTING FOOTBALL PHRASE DETECTION")
-    print("="*60)
+    section("TESTING FOOTBALL PHRASE DETECTION")
 
-    generator = MultiLanguageCaptionGenerator(use_api=False)
+    generator = _get_generator()
 
     phrases_to_test = [
         'GOAL', 'SAVE', 'Yellow Card', 'Red Card',
@@ -58,23 +105,23 @@ def test_phrase_detection():
     languages = ['es', 'pt', 'fr', 'de', 'ar']
 
     print(f"\nTesting {len(phrases_to_test)} phrases in {len(languages)} languages:")
-    print("-" * 60)
+    print(RULE)
+
+    lang_names = {lang: generator.SUPPORTED_LANGUAGES.get(lang, lang) for lang in languages}
 
     for phrase_en in phrases_to_test:
         print(f"\n'{phrase_en}':")
         for lang in languages:
             translated = generator._translate_with_phrases(phrase_en, lang)
-            lang_name = generator.SUPPORTED_LANGUAGES.get(lang, lang)
-            print(f"  {lang_name:15s}: {translated}")
+            print(f"  {lang_names[lang]:15s}: {translated}")
 
     return True
 
 
+@buffered_output
 def test_srt_generation(output_dir='test_output/multilang'):
     """Test SRT file generation in multiple languages"""
-    print("\n" + "="*60)
-    print("TESTING MULTI-LANGUAGE SRT GENERATION")
-    print("="*60)
+    section("TESTING MULTI-LANGUAGE SRT GENERATION")
 
     # Test events
     events = [
@@ -110,32 +157,38 @@ def test_srt_generation(output_dir='test_output/multilang'):
         'competition': 'Premier League'
     }
 
-    generator = MultiLanguageCaptionGenerator(use_api=False)
+    generator = _get_generator()
 
     languages = ['en', 'es', 'pt', 'fr']
 
     print(f"\nGenerating SRT files for {len(languages)} languages...")
     print(f"Output directory: {output_dir}")
 
-    srt_files = generator.generate_multilingual_srt(
-        events,
-        match_meta,
-        output_dir,
-        languages=languages
-    )
+    # Each language writes its own file, so render them in parallel and
+    # print each worker's log in language order afterwards
+    srt_files = {}
+    _warm_caches()
+    with ProcessPoolExecutor(max_workers=min(len(languages), os.cpu_count() or 1)) as executor:
+        futures = [
+            executor.submit(_render_one_lang_srt, events, match_meta, output_dir, lang)
+            for lang in languages
+        ]
+        for future in futures:
+            lang, path, log = future.result()
+            print(log, end='')
+            srt_files[lang] = path
+
+    section("GENERATED SRT FILES:")
 
-    print("\n" + "="*60)
-    print("GENERATED SRT FILES:")
-    print("="*60)
+    lang_names = {lang: generator.SUPPORTED_LANGUAGES.get(lang, lang) for lang in languages}
 
     for lang, path in srt_files.items():
-        lang_name = generator.SUPPORTED_LANGUAGES.get(lang, lang)
-        print(f"  {lang_name:20s}: {path}")
+        print(f"  {lang_names[lang]:20s}: {path}")
 
         # Display first few lines of each SRT
         if os.path.exists(path):
             with open(path, 'r', encoding='utf-8') as f:
-                lines = f.readlines()[:8]  # First entry
+                lines = list(itertools.islice(f, 8))  # First entry
                 print(f"    Preview:")
                 for line in lines:
                     print(f"      {line.rstrip()}")
@@ -144,19 +197,18 @@ def test_srt_generation(output_dir='test_output/multilang'):
     return True
 
 
+@buffered_output
 def test_all_languages():
     """Test translation for all supported languages"""
-    print("\n" + "="*60)
-    print("TESTING ALL SUPPORTED LANGUAGES")
-    print("="*60)
+    section("TESTING ALL SUPPORTED LANGUAGES")
 
-    generator = MultiLanguageCaptionGenerator(use_api=False)
+    generator = _get_generator()
 
     test_caption = "⚽ GOAL! Mohamed Salah 23'"
 
     print(f"\nOriginal: {test_caption}")
     print("\nTranslations:")
-    print("-" * 60)
+    print(RULE)
 
     all_languages = list(generator.SUPPORTED_LANGUAGES.keys())
 
@@ -164,7 +216,7 @@ def test_all_languages():
         if lang == 'en':
             continue
 
-        translated = generator.translate_caption_text(test_caption, lang)
+        translated = _tr(test_caption, lang)
         lang_name = generator.SUPPORTED_LANGUAGES[lang]
         print(f"  {lang_name:25s} ({lang:6s}): {translated}")
 
@@ -173,13 +225,12 @@ def test_all_languages():
     return True
 
 
+@buffered_output
 def test_caption_files(output_dir='test_output/multilang_captions'):
     """Test generating caption files for shorts"""
-    print("\n" + "="*60)
-    print("TESTING CAPTION FILE GENERATION")
-    print("="*60)
+    section("TESTING CAPTION FILE GENERATION")
 
-    generator = MultiLanguageCaptionGenerator(use_api=False)
+    generator = _get_generator()
 
     event = {
         'type': 'goal',
@@ -206,13 +257,12 @@ def test_caption_files(output_dir='test_output/multilang_captions'):
         languages=languages
     )
 
-    print("\n" + "="*60)
-    print("GENERATED CAPTION FILES:")
-    print("="*60)
+    section("GENERATED CAPTION FILES:")
+
+    lang_names = {lang: generator.SUPPORTED_LANGUAGES.get(lang, lang) for lang in languages}
 
     for lang, path in caption_files.items():
-        lang_name = generator.SUPPORTED_LANGUAGES.get(lang, lang)
-        print(f"\n  {lang_name:20s}: {path}")
+        print(f"\n  {lang_names[lang]:20s}: {path}")
 
         # Display content
         if os.path.exists(path):
@@ -223,13 +273,12 @@ def test_caption_files(output_dir='test_output/multilang_captions'):
     return True
 
 
+@buffered_output
 def test_language_coverage():
     """Test that all football phrases are covered in all languages"""
-    print("\n" + "="*60)
-    print("TESTING LANGUAGE COVERAGE")
-    print("="*60)
+    section("TESTING LANGUAGE COVERAGE")
 
-    generator = MultiLanguageCaptionGenerator(use_api=False)
+    generator = _get_generator()
 
     en_phrases = generator.FOOTBALL_PHRASES['en']
     all_langs = generator.FOOTBALL_PHRASES.keys()
@@ -239,35 +288,40 @@ def test_language_coverage():
 
     # Check coverage
     print("\nCoverage analysis:")
-    print("-" * 60)
+    print(RULE)
+
+    # dict_keys views support set arithmetic, so no per-language set() copies
+    en_keys = en_phrases.keys()
+    len_en = len(en_phrases)
 
     for lang in all_langs:
         if lang == 'en':
             continue
 
         lang_phrases = generator.FOOTBALL_PHRASES[lang]
-        coverage = len(lang_phrases) / len(en_phrases) * 100
+        len_lang = len(lang_phrases)
+        coverage = len_lang / len_en * 100
 
         lang_name = generator.SUPPORTED_LANGUAGES.get(lang, lang)
 
-        status = "✓" if coverage == 100 else "⚠️ "
-        print(f"  {status} {lang_name:20s}: {len(lang_phrases)}/{len(en_phrases)} phrases ({coverage:.0f}%)")
+        # Compare counts directly rather than the float percentage
+        status = "✓" if len_lang == len_en else "⚠️ "
+        print(f"  {status} {lang_name:20s}: {len_lang}/{len_en} phrases ({coverage:.0f}%)")
 
         # Show missing phrases if any
-        if coverage < 100:
-            missing = set(en_phrases.keys()) - set(lang_phrases.keys())
+        if len_lang < len_en:
+            missing = en_keys - lang_phrases.keys()
             print(f"       Missing: {', '.join(missing)}")
 
     return True
 
 
+@buffered_output
 def test_emoji_preservation():
     """Test that emojis are preserved during translation"""
-    print("\n" + "="*60)
-    print("TESTING EMOJI PRESERVATION")
-    print("="*60)
+    section("TESTING EMOJI PRESERVATION")
 
-    generator = MultiLanguageCaptionGenerator(use_api=False)
+    generator = _get_generator()
 
     test_cases = [
         "⚽ GOAL!",
@@ -281,14 +335,24 @@ def test_emoji_preservation():
     languages = ['es', 'pt', 'fr']
 
     print("\nTesting emoji preservation in translations:")
-    print("-" * 60)
+    print(RULE)
+
+    # Translate one language at a time so its phrase table is fetched once
+    translations = {}
+    for lang in languages:
+        phrase_table = generator._phrase_table(lang)
+        for caption in test_cases:
+            translations[caption, lang] = generator._translate_with_phrases_precomputed(
+                caption, phrase_table
+            )
 
     for caption in test_cases:
         print(f"\n{caption}")
+        # The leading emoji is the same for every language
+        emoji = caption.split(None, 1)[0]
         for lang in languages:
-            translated = generator.translate_caption_text(caption, lang)
+            translated = translations[caption, lang]
             # Check if original emoji is in translated text
-            emoji = caption.split()[0]
             preserved = "✓" if emoji in translated else "✗"
             lang_name = generator.SUPPORTED_LANGUAGES[lang]
             print(f"  {preserved} {lang_name:15s}: {translated}")
@@ -298,46 +362,34 @@ def test_emoji_preservation():
 
 def test_all():
     """Run all tests"""
-    print("\n" + "="*60)
-    print("RUNNING ALL MULTI-LANGUAGE CAPTION TESTS")
-    print("="*60)
+    section("RUNNING ALL MULTI-LANGUAGE CAPTION TESTS")
+
+    tasks = [
+        ("TEST 1: Caption Translation", test_translation, (['es', 'pt', 'fr', 'de'],)),
+        ("TEST 2: Football Phrase Detection", test_phrase_detection, ()),
+        ("TEST 3: Multi-Language SRT Generation", test_srt_generation, ()),
+        ("TEST 4: All Supported Languages", test_all_languages, ()),
+        ("TEST 5: Caption File Generation", test_caption_files, ()),
+        ("TEST 6: Language Coverage", test_language_coverage, ()),
+        ("TEST 7: Emoji Preservation", test_emoji_preservation, ()),
+    ]
 
     success = True
 
-    try:
-        # Test 1: Basic translation
-        print("\n\n--- TEST 1: Caption Translation ---")
-        test_translation(['es', 'pt', 'fr', 'de'])
-
-        # Test 2: Phrase detection
-        print("\n\n--- TEST 2: Football Phrase Detection ---")
-        test_phrase_detection()
-
-        # Test 3: SRT generation
-        print("\n\n--- TEST 3: Multi-Language SRT Generation ---")
-        test_srt_generation()
-
-        # Test 4: All languages
-        print("\n\n--- TEST 4: All Supported Languages ---")
-        test_all_languages()
-
-        # Test 5: Caption files
-        print("\n\n--- TEST 5: Caption File Generation ---")
-        test_caption_files()
-
-        # Test 6: Language coverage
-        print("\n\n--- TEST 6: Language Coverage ---")
-        test_language_coverage()
-
-        # Test 7: Emoji preservation
-        print("\n\n--- TEST 7: Emoji Preservation ---")
-        test_emoji_preservation()
-
-    except Exception as e:
-        print(f"\n✗ Test failed: {str(e)}")
-        import traceback
-        traceback.print_exc()
-        success = False
+    # The tests share nothing but stdout, so run them side by side in worker
+    # processes (each captures its own output) and print them in order.
+    _warm_caches()
+    with ProcessPoolExecutor(max_workers=4) as executor:
+        futures = [executor.submit(run_captured, label, fn, *args)
+                   for label, fn, args in tasks]
+        for future in futures:
+            label, output, error = future.result()
+            print(f"\n\n--- {label} ---")
+            print(output, end='')
+            if error:
+                print(f"\n✗ Test failed: {label}")
+                print(error, end='')
+                success = False
 
     return success
 
@@ -373,12 +425,12 @@ def main():
     elif args.test == 'all':
         success = test_all()
 
-    print("\n" + "="*60)
+    print("\n" + BANNER)
     if success:
         print("✓ ALL TESTS PASSED")
     else:
         print("✗ SOME TESTS FAILED")
-    print("="*60)
+    print(BANNER)
 
     sys.exit(0 if success else 1)
 
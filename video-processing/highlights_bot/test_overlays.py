@@ -5,51 +5,88 @@ Tests scorebug, lower-thirds, and opening/closing slates
 """
 
 import argparse
+import hashlib
 import os
 import sys
 import json
+import traceback
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
-from overlays import (
-    create_scorebug, apply_scorebug,
-    create_goal_lowerthird, apply_lowerthird,
-    create_opening_slate, create_closing_slate
-)
+from tests_common import BANNER, buffered_output, section
 
 
+# Sample inputs shared by the create and apply tests
+SCOREBUG_META = {
+    'home_short': 'MAN',
+    'away_short': 'LIV',
+    'score': '2-1',
+    'current_minute': 45
+}
+
+SCOREBUG_ASSETS = {
+    'font_bold': 'brand/fonts/Inter-Bold.ttf',
+    'home_badge': 'brand/badges/home_team.png',
+    'away_badge': 'brand/badges/away_team.png'
+}
+
+LOWERTHIRD_EVENT = {
+    'player': 'Mohamed Salah',
+    'team': 'Liverpool',
+    'minute': '67',
+    'assister': 'Trent Alexander-Arnold'
+}
+
+LOWERTHIRD_ASSETS = {
+    'font_bold': 'brand/fonts/Inter-Bold.ttf',
+    'font_regular': 'brand/fonts/Inter-Regular.ttf'
+}
+
+
+def _file_size(path):
+    """Size of path in bytes, or None if it doesn't exist (a single stat)"""
+    try:
+        return os.stat(path).st_size
+    except FileNotFoundError:
+        return None
+
+
+def _overlay_path(output_dir, name, data, brand_assets):
+    """
+    Content-addressed PNG path for an overlay.
+
+    The name carries a hash of the inputs (and the mtimes of any brand asset
+    files), so a PNG on disk is only reused when it was rendered from the
+    same data.
+    """
+    asset_mtimes = {}
+    for key, path in brand_assets.items():
+        try:
+            asset_mtimes[key] = os.stat(path).st_mtime
+        except FileNotFoundError:
+            pass
+    key = json.dumps([data, brand_assets, asset_mtimes], sort_keys=True)
+    digest = hashlib.sha1(key.encode('utf-8')).hexdigest()[:12]
+    return os.path.join(output_dir, f"{name}_{digest}.png")
+
+
+@buffered_output
 def test_scorebug(output_dir='test_output'):
     """Test scorebug creation and application"""
-    print("\n" + "="*60)
-    print("TESTING SCOREBUG")
-    print("="*60)
-
-    os.makedirs(output_dir, exist_ok=True)
-
-    # Sample match metadata
-    match_meta = {
-        'home_short': 'MAN',
-        'away_short': 'LIV',
-        'score': '2-1',
-        'current_minute': 45
-    }
+    from overlays import create_scorebug
 
-    # Sample brand assets
-    brand_assets = {
-        'font_bold': 'brand/fonts/Inter-Bold.ttf',
-        'home_badge': 'brand/badges/home_team.png',
-        'away_badge': 'brand/badges/away_team.png'
-    }
+    section("TESTING SCOREBUG")
 
     # Create scorebug
-    scorebug_path = os.path.join(output_dir, 'scorebug.png')
+    scorebug_path = _overlay_path(output_dir, 'scorebug', SCOREBUG_META, SCOREBUG_ASSETS)
 
     try:
-        result = create_scorebug(match_meta, brand_assets, scorebug_path)
+        result = create_scorebug(SCOREBUG_META, SCOREBUG_ASSETS, scorebug_path)
         print(f"✓ Scorebug created: {result}")
 
-        # Check if file exists
-        if os.path.exists(scorebug_path):
-            file_size = os.path.getsize(scorebug_path)
+        # Check the file was written (one stat for existence and size)
+        file_size = _file_size(scorebug_path)
+        if file_size is not None:
             print(f"  File size: {file_size} bytes")
             return True
         else:
@@ -58,43 +95,27 @@ def test_scorebug(output_dir='test_output'):
 
     except Exception as e:
         print(f"✗ Scorebug creation failed: {str(e)}")
-        import traceback
         traceback.print_exc()
         return False
 
 
+@buffered_output
 def test_lowerthird(output_dir='test_output'):
     """Test goal lower-third creation"""
-    print("\n" + "="*60)
-    print("TESTING GOAL LOWER-THIRD")
-    print("="*60)
-
-    os.makedirs(output_dir, exist_ok=True)
-
-    # Sample event data
-    event_data = {
-        'player': 'Mohamed Salah',
-        'team': 'Liverpool',
-        'minute': '67',
-        'assister': 'Trent Alexander-Arnold'
-    }
+    from overlays import create_goal_lowerthird
 
-    # Sample brand assets
-    brand_assets = {
-        'font_bold': 'brand/fonts/Inter-Bold.ttf',
-        'font_regular': 'brand/fonts/Inter-Regular.ttf'
-    }
+    section("TESTING GOAL LOWER-THIRD")
 
     # Create lower-third
-    lowerthird_path = os.path.join(output_dir, 'lowerthird.png')
+    lowerthird_path = _overlay_path(output_dir, 'lowerthird', LOWERTHIRD_EVENT, LOWERTHIRD_ASSETS)
 
     try:
-        result = create_goal_lowerthird(event_data, brand_assets, lowerthird_path)
+        result = create_goal_lowerthird(LOWERTHIRD_EVENT, LOWERTHIRD_ASSETS, lowerthird_path)
         print(f"✓ Lower-third created: {result}")
 
-        # Check if file exists
-        if os.path.exists(lowerthird_path):
-            file_size = os.path.getsize(lowerthird_path)
+        # Check the file was written (one stat for existence and size)
+        file_size = _file_size(lowerthird_path)
+        if file_size is not None:
             print(f"  File size: {file_size} bytes")
             return True
         else:
@@ -103,18 +124,44 @@ def test_lowerthird(output_dir='test_output'):
 
     except Exception as e:
         print(f"✗ Lower-third creation failed: {str(e)}")
-        import traceback
         traceback.print_exc()
         return False
 
 
+def _check_slate(label, create_fn, meta, brand_assets, output_path, duration):
+    """
+    Create one slate and check the file was written.
+
+    Returns: (success, report text) so concurrent runs can print in order
+    """
+    lines = [f"\nTesting {label} Slate..."]
+    success = True
+
+    try:
+        result = create_fn(meta, brand_assets, output_path, duration=duration)
+        lines.append(f"✓ {label} slate created: {result}")
+
+        file_size = _file_size(output_path)
+        if file_size is not None:
+            lines.append(f"  File size: {file_size} bytes")
+        else:
+            lines.append(f"✗ {label} slate file not created")
+            success = False
+
+    except Exception as e:
+        lines.append(f"✗ {label} slate creation failed: {str(e)}")
+        lines.append(traceback.format_exc().rstrip())
+        success = False
+
+    return success, ''.join(f"{line}\n" for line in lines)
+
+
+@buffered_output
 def test_slates(output_dir='test_output'):
     """Test opening and closing slate creation"""
-    print("\n" + "="*60)
-    print("TESTING OPENING/CLOSING SLATES")
-    print("="*60)
+    from overlays import create_opening_slate, create_closing_slate
 
-    os.makedirs(output_dir, exist_ok=True)
+    section("TESTING OPENING/CLOSING SLATES")
 
     # Sample match metadata for opening slate
     opening_meta = {
@@ -140,81 +187,59 @@ def test_slates(output_dir='test_output'):
         'sponsor_logo': 'brand/badges/sponsor.png'
     }
 
-    success = True
-
-    # Test opening slate
-    print("\nTesting Opening Slate...")
     opening_path = os.path.join(output_dir, 'opening_slate.mp4')
-
-    try:
-        result = create_opening_slate(opening_meta, brand_assets, opening_path, duration=2.5)
-        print(f"✓ Opening slate created: {result}")
-
-        if os.path.exists(opening_path):
-            file_size = os.path.getsize(opening_path)
-            print(f"  File size: {file_size} bytes")
-        else:
-            print("✗ Opening slate file not created")
-            success = False
-
-    except Exception as e:
-        print(f"✗ Opening slate creation failed: {str(e)}")
-        import traceback
-        traceback.print_exc()
-        success = False
-
-    # Test closing slate
-    print("\nTesting Closing Slate...")
     closing_path = os.path.join(output_dir, 'closing_slate.mp4')
 
-    try:
-        result = create_closing_slate(closing_meta, brand_assets, closing_path, duration=3.0)
-        print(f"✓ Closing slate created: {result}")
-
-        if os.path.exists(closing_path):
-            file_size = os.path.getsize(closing_path)
-            print(f"  File size: {file_size} bytes")
-        else:
-            print("✗ Closing slate file not created")
-            success = False
+    # The two slates are independent ffmpeg encodes, so run them side by side
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        opening = executor.submit(_check_slate, "Opening", create_opening_slate,
+                                  opening_meta, brand_assets, opening_path, 2.5)
+        closing = executor.submit(_check_slate, "Closing", create_closing_slate,
+                                  closing_meta, brand_assets, closing_path, 3.0)
+        results = [opening.result(), closing.result()]
 
-    except Exception as e:
-        print(f"✗ Closing slate creation failed: {str(e)}")
-        import traceback
-        traceback.print_exc()
-        success = False
+    success = True
+    for ok, report in results:
+        print(report, end='')
+        success = ok and success
 
     return success
 
 
+@buffered_output
 def test_apply_overlays(video_path, output_dir='test_output'):
     """Test applying overlays to actual video"""
-    print("\n" + "="*60)
-    print("TESTING OVERLAY APPLICATION")
-    print("="*60)
+    from overlays import (
+        create_scorebug, apply_scorebug,
+        create_goal_lowerthird, apply_lowerthird
+    )
+
+    section("TESTING OVERLAY APPLICATION")
 
     if not os.path.exists(video_path):
         print(f"Error: Test video not found: {video_path}")
         print("Skipping overlay application tests")
         return True  # Don't fail if no test video
 
-    os.makedirs(output_dir, exist_ok=True)
-
     success = True
 
+    # Work out every input and output path up front
+    scorebug_path = _overlay_path(output_dir, 'scorebug', SCOREBUG_META, SCOREBUG_ASSETS)
+    lowerthird_path = _overlay_path(output_dir, 'lowerthird', LOWERTHIRD_EVENT, LOWERTHIRD_ASSETS)
+    output_videos = {
+        name: os.path.join(output_dir, f'video_with_{name}.mp4')
+        for name in ('scorebug', 'lowerthird')
+    }
+
     # Test scorebug application
     print("\nApplying scorebug to video...")
-    scorebug_path = os.path.join(output_dir, 'scorebug.png')
     if not os.path.exists(scorebug_path):
         print("  Creating scorebug first...")
-        match_meta = {'home_short': 'MAN', 'away_short': 'LIV', 'score': '2-1', 'current_minute': 45}
-        brand_assets = {}
-        create_scorebug(match_meta, brand_assets, scorebug_path)
-
-    output_video = os.path.join(output_dir, 'video_with_scorebug.mp4')
+        create_scorebug(SCOREBUG_META, SCOREBUG_ASSETS, scorebug_path)
 
     try:
-        result = apply_scorebug(video_path, scorebug_path, output_video, position='top-left')
+        result = apply_scorebug(video_path, scorebug_path, output_videos['scorebug'],
+                                position='top-left')
         print(f"✓ Scorebug applied to video: {result}")
     except Exception as e:
         print(f"✗ Scorebug application failed: {str(e)}")
@@ -222,17 +247,13 @@ def test_apply_overlays(video_path, output_dir='test_output'):
 
     # Test lower-third application
     print("\nApplying lower-third to video...")
-    lowerthird_path = os.path.join(output_dir, 'lowerthird.png')
     if not os.path.exists(lowerthird_path):
         print("  Creating lower-third first...")
-        event_data = {'player': 'Mohamed Salah', 'team': 'Liverpool', 'minute': '67', 'assister': 'TAA'}
-        brand_assets = {}
-        create_goal_lowerthird(event_data, brand_assets, lowerthird_path)
-
-    output_video = os.path.join(output_dir, 'video_with_lowerthird.mp4')
+        create_goal_lowerthird(LOWERTHIRD_EVENT, LOWERTHIRD_ASSETS, lowerthird_path)
 
     try:
-        result = apply_lowerthird(video_path, lowerthird_path, output_video, start_time=2.0, duration=3.0)
+        result = apply_lowerthird(video_path, lowerthird_path, output_videos['lowerthird'],
+                                  start_time=2.0, duration=3.0)
         print(f"✓ Lower-third applied to video: {result}")
     except Exception as e:
         print(f"✗ Lower-third application failed: {str(e)}")
@@ -250,6 +271,9 @@ def main():
 
     args = parser.parse_args()
 
+    # Every test writes here; create it once rather than in each test
+    os.makedirs(args.output, exist_ok=True)
+
     success = True
 
     if args.test == 'scorebug' or args.test == 'all':
@@ -268,12 +292,12 @@ def main():
             print("Error: --video argument required for apply test")
             success = False
 
-    print("\n" + "="*60)
+    print("\n" + BANNER)
     if success:
         print("✓ ALL TESTS PASSED")
     else:
         print("✗ SOME TESTS FAILED")
-    print("="*60)
+    print(BANNER)
 
     sys.exit(0 if success else 1)
 
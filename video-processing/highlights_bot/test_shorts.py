@@ -8,8 +8,11 @@ import argparse
 import os
 import sys
 import json
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
+import numpy as np
+
 from shorts import (
     smart_crop_to_vertical,
     add_vertical_overlays,
@@ -19,6 +22,7 @@ from shorts import (
     generate_thumbnail,
     batch_export_for_platforms
 )
+from tests_common import run_captured, task_output
 
 
 def test_smart_crop(input_path, output_path=None, bbox_file=None):
@@ -41,6 +45,14 @@ def test_smart_crop(input_path, output_path=None, bbox_file=None):
             bbox_data = json.load(f)
         print(f"Loaded bbox data: {len(bbox_data)} entries")
 
+        # Dict entries become an (N, 5) array of (timestamp, x, y, w, h)
+        if bbox_data and isinstance(bbox_data[0], dict):
+            bbox_data = np.array(
+                [(item['timestamp'], item['x'], item['y'], item['w'], item['h'])
+                 for item in bbox_data],
+                dtype=np.float64
+            )
+
     print(f"Input: {input_path}")
     print(f"Output: {output_path}")
     print(f"Target resolution: 1080x1920 (9:16)")
@@ -186,8 +198,10 @@ def test_generate_shorts(input_path, events_file, output_dir='test_output/shorts
         )
         print(f"\n✓ Shorts generation complete!")
         print(f"  Generated {len(result)} shorts:")
-        for idx, short in enumerate(result, 1):
-            print(f"    {idx}. {short['path']} ({short['duration']:.1f}s, score: {short['score']:.1f})")
+        sys.stdout.write(''.join(
+            f"    {idx}. {short['path']} ({short['duration']:.1f}s, score: {short['score']:.1f})\n"
+            for idx, short in enumerate(result, 1)
+        ))
         return True
 
     except Exception as e:
@@ -278,8 +292,7 @@ def test_platform_export(input_path, output_dir='test_output/platforms'):
             platforms=['tiktok', 'reels', 'shorts']
         )
         print(f"\n✓ Platform exports complete!")
-        for platform, path in result.items():
-            print(f"  {platform}: {path}")
+        sys.stdout.write(''.join(f"  {platform}: {path}\n" for platform, path in result.items()))
         return True
 
     except Exception as e:
@@ -308,33 +321,59 @@ def main():
     args = parser.parse_args()
 
     success = True
+    run_all = args.test == 'all'
+    tasks = []
 
-    if args.test == 'crop' or args.test == 'all':
-        success = test_smart_crop(args.input, args.output, args.bbox) and success
+    def output_for(name):
+        return task_output(args.output, name, run_all)
 
-    if args.test == 'overlays' or args.test == 'all':
-        success = test_vertical_overlays(args.input, args.output) and success
+    if args.test == 'crop' or run_all:
+        tasks.append(('crop', test_smart_crop, (args.input, output_for('vertical'), args.bbox)))
 
-    if args.test == 'extract' or args.test == 'all':
-        success = test_extract_clip(args.input, args.start, args.end, args.output) and success
+    if args.test == 'overlays' or run_all:
+        tasks.append(('overlays', test_vertical_overlays, (args.input, output_for('with_overlays'))))
 
-    if args.test == 'generate' or args.test == 'all':
+    if args.test == 'extract' or run_all:
+        tasks.append(('extract', test_extract_clip,
+                      (args.input, args.start, args.end, output_for('clip'))))
+
+    if args.test == 'generate' or run_all:
         if args.events:
             output_dir = args.output or 'test_output/shorts'
-            success = test_generate_shorts(args.input, args.events, output_dir, args.count) and success
+            tasks.append(('generate', test_generate_shorts,
+                          (args.input, args.events, output_dir, args.count)))
         elif args.test == 'generate':
             print("Error: --events argument required for generate test")
             success = False
 
-    if args.test == 'effects' or args.test == 'all':
-        success = test_trending_effects(args.input, args.output, args.effect) and success
+    if args.test == 'effects' or run_all:
+        tasks.append(('effects', test_trending_effects,
+                      (args.input, output_for(args.effect), args.effect)))
 
-    if args.test == 'thumbnail' or args.test == 'all':
-        success = test_thumbnail(args.input, args.output, args.timestamp) and success
+    if args.test == 'thumbnail' or run_all:
+        tasks.append(('thumbnail', test_thumbnail,
+                      (args.input, output_for('thumbnail'), args.timestamp)))
 
-    if args.test == 'export' or args.test == 'all':
+    if args.test == 'export' or run_all:
         output_dir = args.output or 'test_output/platforms'
-        success = test_platform_export(args.input, output_dir) and success
+        tasks.append(('export', test_platform_export, (args.input, output_dir)))
+
+    if run_all:
+        # Every test writes its own outputs with its own ffmpeg processes, so
+        # run a few side by side (each already uses several cores) and print
+        # each one's captured output in order
+        with ProcessPoolExecutor(max_workers=min(3, os.cpu_count() or 1)) as executor:
+            futures = [executor.submit(run_captured, name, func, *func_args)
+                       for name, func, func_args in tasks]
+            for future in futures:
+                _, output, error = future.result()
+                print(output, end='')
+                if error:
+                    print(error, end='')
+                    success = False
+    else:
+        for _, func, func_args in tasks:
+            success = func(*func_args) and success
 
     print("\n" + "="*60)
     if success:
@@ -0,0 +1,113 @@
+"""
+Shared helpers for the standalone test scripts
+"""
+
+import contextlib
+import functools
+import io
+import json
+import os
+import sys
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+BANNER = "=" * 60
+RULE = "-" * 60
+
+
+def section(title, *lines):
+    """
+    Print a banner-wrapped section header, plus any extra lines.
+
+    Everything goes out in a single write, so headers stay intact when tests
+    run concurrently or stdout is piped.
+    """
+    sys.stdout.write(f"\n{BANNER}\n{title}\n{BANNER}\n" + ''.join(f"{line}\n" for line in lines))
+
+
+def buffered_output(test_fn):
+    """
+    Decorator: collect everything a test prints and emit it in one write.
+
+    Chatty tests print line by line from nested loops; buffering turns
+    those into a single stdout write. Output is still flushed if the test
+    raises.
+    """
+    @functools.wraps(test_fn)
+    def wrapper(*args, **kwargs):
+        buf = io.StringIO()
+        try:
+            with contextlib.redirect_stdout(buf):
+                return test_fn(*args, **kwargs)
+        finally:
+            sys.stdout.write(buf.getvalue())
+    return wrapper
+
+
+def load_json(path):
+    """Load a JSON file, using orjson when it is installed (much faster on big files)."""
+    try:
+        import orjson
+    except ImportError:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    with open(path, 'rb') as f:
+        return orjson.loads(f.read())
+
+
+def require(path, label):
+    """Stat a required input file once, raising FileNotFoundError if missing."""
+    try:
+        return os.stat(path)
+    except FileNotFoundError:
+        raise FileNotFoundError(f"Error: {label} file not found: {path}") from None
+
+
+def sibling_output(input_path, suffix):
+    """Default output path next to the input: /dir/clip.mp4 -> /dir/clip_<suffix>.mp4"""
+    path = Path(input_path)
+    return str(path.with_name(f"{path.stem}{suffix}.mp4"))
+
+
+def task_output(output_path, name, run_all):
+    """Give each test its own output file when --test all shares one --output."""
+    if output_path and run_all:
+        root, ext = os.path.splitext(output_path)
+        return f"{root}_{name}{ext}"
+    return output_path
+
+
+def run_tasks(tasks, parallel):
+    """
+    Run (name, func, args) test tasks and return their results in order.
+
+    In parallel mode the tests run on a thread pool; each one spends its
+    time waiting on its own FFmpeg process, so threads overlap them fully.
+    """
+    if parallel and len(tasks) > 1:
+        with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+            return list(executor.map(lambda task: task[1](*task[2]), tasks))
+    return [func(*func_args) for _, func, func_args in tasks]
+
+
+def run_captured(label, test_fn, *args):
+    """
+    Run one test with its stdout captured, for use as a pool worker.
+
+    redirect_stdout swaps the process-wide sys.stdout, so this belongs in a
+    worker process rather than a thread.
+
+    Returns: (label, captured output, error text or None); a test that
+    returns False counts as an error
+    """
+    buf = io.StringIO()
+    error = None
+    with contextlib.redirect_stdout(buf):
+        try:
+            if test_fn(*args) is False:
+                error = f"{label} returned False\n"
+        except Exception:
+            error = traceback.format_exc()
+    return label, buf.getvalue(), error
@@ -3,53 +3,87 @@ Utility functions for the Highlights Expert bot
 Handles timecode conversion, file operations, subprocess wrappers, and logging
 """
 
+import atexit
+import copy
 import os
 import json
 import subprocess
+import threading
+import time
 import logging
+import logging.handlers
+import queue
+from collections import OrderedDict
 from datetime import datetime, timedelta
+from functools import lru_cache
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple, Union
 import re
 
+import numpy as np
+
+from encoders import NVENC_ARGS, nvenc_available
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# ffprobe results keyed by (resolved path, mtime_ns, size), so re-probing an
+# unchanged file skips the subprocess; a rewritten file gets a new key.
+# Least recently used entries are dropped past PROBE_CACHE_SIZE
+PROBE_CACHE_SIZE = 256
+_PROBE_CACHE = OrderedDict()
+_PROBE_LOCK = threading.Lock()
+_PROBE_ENTRIES = ('format=duration:'
+                  'stream=codec_type,codec_name,width,height,r_frame_rate,sample_rate')
+
+# Clock/timestamp text: [hh:]mm:ss with optional fractional seconds
+_CLOCK_RE = re.compile(r'^(?:(\d+):)?(\d+):(\d+)(?:\.(\d+))?$')
+# Plain-seconds clocks ("2700", "2700.5"), which parse_match_clock also accepts
+_SECONDS_RE = re.compile(r'^\d+(?:\.\d+)?$')
+
+def _json_bytes(data, indent: bool = False) -> bytes:
+    """Serialize to JSON bytes, with orjson when installed and it can handle the data"""
+    if orjson is not None:
+        option = orjson.OPT_SERIALIZE_NUMPY | (orjson.OPT_INDENT_2 if indent else 0)
+        try:
+            return orjson.dumps(data, option=option)
+        except TypeError:
+            pass  # e.g. non-string keys; let the stdlib encoder try
+    # Anything still unserializable (Path, datetime, ...) is written as str()
+    return json.dumps(data, indent=2 if indent else None, default=str).encode('utf-8')
+
+def _clock_match_seconds(match: re.Match) -> float:
+    """Total seconds from a _CLOCK_RE match"""
+    hours, minutes, seconds, fraction = match.groups()
+    total = (int(hours) * 3600 if hours else 0) + int(minutes) * 60 + int(seconds)
+    if fraction:
+        total += int(fraction) / 10 ** len(fraction)
+    return total
+
 class TimeCodeUtils:
     """Utilities for handling timecode conversion and calculations"""
 
     @staticmethod
     def parse_match_clock(clock_str: str) -> float:
-        """Convert mm:ss to total seconds"""
+        """Convert mm:ss (or hh:mm:ss) to total seconds"""
+        match = _CLOCK_RE.match(clock_str.strip())
+        if match is not None:
+            return _clock_match_seconds(match)
         try:
-            parts = clock_str.split(':')
-            if len(parts) == 2:
-                minutes, seconds = int(parts[0]), int(parts[1])
-                return minutes * 60 + seconds
-            elif len(parts) == 3:
-                hours, minutes, seconds = int(parts[0]), int(parts[1]), int(parts[2])
-                return hours * 3600 + minutes * 60 + seconds
-            else:
-                return float(clock_str)
-        except (ValueError, IndexError):
+            return float(clock_str)
+        except ValueError:
             return 0.0
 
     @staticmethod
     def parse_timestamp(ts_str: str) -> float:
         """Convert HH:MM:SS.sss to total seconds"""
-        try:
-            # Handle formats like "01:23:45.678" or "01:23:45"
-            time_part = ts_str.split('.')[0]
-            microsec_part = ts_str.split('.')[1] if '.' in ts_str else "0"
-
-            h, m, s = map(int, time_part.split(':'))
-            total_seconds = h * 3600 + m * 60 + s
-
-            # Add fractional seconds
-            if microsec_part:
-                fraction = float(f"0.{microsec_part}")
-                total_seconds += fraction
-
-            return total_seconds
-        except (ValueError, IndexError):
+        # Handle formats like "01:23:45.678" or "01:23:45"
+        match = _CLOCK_RE.match(ts_str.strip())
+        if match is None:
             return 0.0
+        return float(_clock_match_seconds(match))
 
     @staticmethod
     def seconds_to_timestamp(seconds: float) -> str:
@@ -59,6 +93,16 @@ class TimeCodeUtils:
         secs = seconds % 60
         return f"{hours:02d}:{minutes:02d}:{secs:06.3f}"
 
+    @staticmethod
+    def seconds_to_timestamps(seconds: List[float]) -> List[str]:
+        """Convert many second values to HH:MM:SS.sss, doing the arithmetic as arrays"""
+        seconds = np.asarray(seconds, dtype=np.float64)
+        hours = (seconds // 3600).astype(np.int64)
+        minutes = ((seconds % 3600) // 60).astype(np.int64)
+        secs = seconds % 60
+        return [f"{h:02d}:{m:02d}:{s:06.3f}"
+                for h, m, s in zip(hours.tolist(), minutes.tolist(), secs.tolist())]
+
     @staticmethod
     def seconds_to_clock(seconds: float) -> str:
         """Convert seconds to mm:ss format"""
@@ -88,6 +132,33 @@ class TimeCodeUtils:
         else:
             return kickoff_time + clock_seconds
 
+    @staticmethod
+    def compute_absolute_times_batch(halves: List[int], clocks: List[str], kickoff_time: float,
+                                     ht_duration: int = 15,
+                                     first_half_duration: float = 49 * 60) -> np.ndarray:
+        """
+        Compute absolute timestamps for many events at once
+
+        Same rules as compute_absolute_time, applied to whole arrays.
+
+        Args:
+            halves: Match half (1 or 2) per event
+            clocks: "mm:ss" clock per event
+            kickoff_time: absolute time of kickoff in seconds
+            ht_duration: half-time duration in minutes
+            first_half_duration: assumed first-half length in seconds
+
+        Returns:
+            float64 array of absolute timestamps, one per event
+        """
+        clock_seconds = np.fromiter(
+            (TimeCodeUtils.parse_match_clock(clock) for clock in clocks),
+            dtype=np.float64, count=len(clocks)
+        )
+        halves = np.asarray(halves)
+        offsets = np.where(halves == 2, first_half_duration + ht_duration * 60, 0.0)
+        return kickoff_time + offsets + clock_seconds
+
 class FileUtils:
     """File and directory operations"""
 
@@ -95,26 +166,47 @@ class FileUtils:
     def ensure_dir(path: Union[str, Path]) -> Path:
         """Ensure directory exists, create if not"""
         path = Path(path)
-        path.mkdir(parents=True, exist_ok=True)
+        # Usually it already exists: one stat, no mkdir round trip
+        if not os.path.isdir(path):
+            path.mkdir(parents=True, exist_ok=True)
         return path
 
     @staticmethod
     def clean_temp_files(temp_dir: Union[str, Path]):
         """Clean temporary files from directory"""
-        temp_dir = Path(temp_dir)
-        if temp_dir.exists():
-            for file in temp_dir.glob("*"):
-                if file.is_file():
-                    try:
-                        file.unlink()
-                    except OSError:
-                        pass
+        # scandir entries carry their file type, so no extra stat per file
+        try:
+            with os.scandir(temp_dir) as entries:
+                for entry in entries:
+                    if entry.is_file():
+                        try:
+                            os.unlink(entry.path)
+                        except OSError:
+                            pass
+        except (FileNotFoundError, NotADirectoryError):
+            pass
 
     @staticmethod
     def get_video_info(video_path: Union[str, Path]) -> Dict:
-        """Get video information using ffprobe"""
+        """Get video information using ffprobe (cached per unchanged file)"""
+        try:
+            st = os.stat(video_path)
+            key = (str(Path(video_path).resolve()), st.st_mtime_ns, st.st_size)
+        except OSError:
+            key = None  # Not a local file (e.g. a stream URL); probe uncached
+
+        if key:
+            with _PROBE_LOCK:
+                cached = _PROBE_CACHE.get(key)
+                if cached is not None:
+                    _PROBE_CACHE.move_to_end(key)
+                    return dict(cached)
+
+        # Ask only for the fields used below, so files with many streams
+        # still produce a small JSON document
         cmd = [
-            'ffprobe', '-v', 'quiet', '-print_format', 'json', '-show_format', '-show_streams',
+            'ffprobe', '-v', 'quiet', '-print_format', 'json',
+            '-show_entries', _PROBE_ENTRIES,
             str(video_path)
         ]
 
@@ -122,75 +214,144 @@ class FileUtils:
             result = subprocess.run(cmd, capture_output=True, text=True, check=True)
             info = json.loads(result.stdout)
 
-            # Find video stream
+            # Find the first video and audio streams
             video_stream = None
+            audio_stream = None
             for stream in info.get('streams', []):
-                if stream.get('codec_type') == 'video':
+                codec_type = stream.get('codec_type')
+                if codec_type == 'video' and video_stream is None:
                     video_stream = stream
-                    break
+                elif codec_type == 'audio' and audio_stream is None:
+                    audio_stream = stream
 
             if not video_stream:
                 return {}
 
             duration = float(info.get('format', {}).get('duration', 0))
             fps_str = video_stream.get('r_frame_rate', '30/1')
-            fps = eval(fps_str) if '/' in fps_str else float(fps_str)
+            if '/' in fps_str:
+                # ffprobe reports "0/0" for streams without a fixed rate
+                num, den = fps_str.split('/', 1)
+                fps = int(num) / max(int(den), 1)
+            else:
+                fps = float(fps_str)
 
-            return {
+            video_info = {
                 'duration': duration,
                 'fps': fps,
                 'width': int(video_stream.get('width', 0)),
                 'height': int(video_stream.get('height', 0)),
-                'codec': video_stream.get('codec_name', 'unknown')
+                'codec': video_stream.get('codec_name', 'unknown'),
+                'audio_codec': audio_stream.get('codec_name') if audio_stream else None,
+                'audio_sample_rate': int(audio_stream.get('sample_rate', 0)) if audio_stream else None
             }
+            if key:
+                with _PROBE_LOCK:
+                    _PROBE_CACHE[key] = video_info
+                    _PROBE_CACHE.move_to_end(key)
+                    while len(_PROBE_CACHE) > PROBE_CACHE_SIZE:
+                        _PROBE_CACHE.popitem(last=False)
+            return dict(video_info)
 
         except (subprocess.CalledProcessError, json.JSONDecodeError, Exception):
             return {}
 
+# ffmpeg -progress keys worth forwarding to the debug log
+_PROGRESS_KEYS = frozenset({'frame', 'out_time_ms', 'speed'})
+
 class FFmpegRunner:
     """Wrapper for FFmpeg operations with logging"""
 
-    def __init__(self, logger: logging.Logger):
+    def __init__(self, logger: logging.Logger, encoder: Optional[str] = None,
+                 threads: Optional[int] = None):
+        """
+        Args:
+            logger: Logger for command progress and failures
+            encoder: 'nvenc', 'cpu', or None/'auto' to use NVENC when available
+            threads: Encoder thread count; when running several runners side by
+                side, pass each a share of the cores. Defaults to all cores,
+                capped at 16
+        """
         self.logger = logger
+        self.use_nvenc = encoder == 'nvenc' or (encoder in (None, 'auto') and nvenc_available())
+        self.enc_threads = threads or min(16, os.cpu_count() or 4)
 
     def run_ffmpeg(self, cmd: List[str], description: str = "FFmpeg operation") -> bool:
-        """Run FFmpeg command with logging"""
-        self.logger.info(f"Starting {description}")
-        self.logger.debug(f"FFmpeg command: {' '.join(cmd)}")
+        """Run FFmpeg command with logging, streaming its progress to the debug log"""
+        self.logger.info("Starting %s", description)
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug("FFmpeg command: %s", ' '.join(cmd))
+
+        # Structured progress on stdout instead of per-frame stats on stderr,
+        # so stderr only carries errors and nothing large is buffered
+        cmd = [cmd[0], '-nostats', '-progress', 'pipe:1', '-loglevel', 'error', *cmd[1:]]
 
         try:
-            result = subprocess.run(
+            with subprocess.Popen(
                 cmd,
-                capture_output=True,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
                 text=True,
-                check=True
-            )
-            self.logger.info(f"Completed {description}")
+                bufsize=1
+            ) as proc:
+                progress_thread = threading.Thread(
+                    target=self._log_progress, args=(proc.stdout, description), daemon=True
+                )
+                progress_thread.start()
+                stderr = proc.stderr.read()
+                returncode = proc.wait()
+                progress_thread.join()
+
+            if returncode != 0:
+                self.logger.error("FFmpeg failed for %s: %s", description, stderr)
+                return False
+
+            self.logger.info("Completed %s", description)
             return True
 
-        except subprocess.CalledProcessError as e:
-            self.logger.error(f"FFmpeg failed for {description}: {e.stderr}")
-            return False
         except Exception as e:
-            self.logger.error(f"Unexpected error in {description}: {str(e)}")
+            self.logger.error("Unexpected error in %s: %s", description, e)
             return False
 
+    def _log_progress(self, stream, description: str):
+        """Forward frame/time/speed lines from ffmpeg -progress output to the debug log"""
+        for line in stream:
+            key, _, value = line.strip().partition('=')
+            if key in _PROGRESS_KEYS:
+                self.logger.debug("%s progress: %s=%s", description, key, value)
+
     def extract_audio(self, input_path: str, output_path: str) -> bool:
         """Extract audio track from video"""
+        # Already 16-bit PCM at 44.1kHz: copy the samples instead of re-encoding
+        info = FileUtils.get_video_info(input_path)
+        if info.get('audio_codec') == 'pcm_s16le' and info.get('audio_sample_rate') == 44100:
+            audio_args = ['-c:a', 'copy']
+        else:
+            audio_args = ['-acodec', 'pcm_s16le', '-ar', '44100']
+
         cmd = [
             'ffmpeg', '-y', '-i', input_path,
-            '-vn', '-acodec', 'pcm_s16le', '-ar', '44100',
+            '-vn', *audio_args,
             output_path
         ]
         return self.run_ffmpeg(cmd, "audio extraction")
 
     def normalize_video(self, input_path: str, output_path: str, target_fps: int = 30) -> bool:
         """Normalize video to consistent FPS and audio levels"""
+        if self.use_nvenc:
+            # Hardware decode where possible, encode on the GPU
+            input_args = ['-hwaccel', 'auto']
+            video_args = NVENC_ARGS
+        else:
+            input_args = []
+            video_args = ['-c:v', 'libx264', '-preset', 'fast', '-crf', '18']
+
         cmd = [
-            'ffmpeg', '-y', '-i', input_path,
+            'ffmpeg', '-y', *input_args, '-i', input_path,
             '-r', str(target_fps),
             '-af', 'loudnorm=I=-16:TP=-1.5:LRA=11',
-            '-c:v', 'libx264', '-preset', 'fast', '-crf', '18',
+            *video_args,
+            '-threads', str(self.enc_threads),
             output_path
         ]
         return self.run_ffmpeg(cmd, "video normalization")
@@ -224,84 +385,156 @@ class HighlightsLogger:
         file_handler.setFormatter(detailed_formatter)
         console_handler.setFormatter(simple_formatter)
 
-        self.logger.addHandler(file_handler)
-        self.logger.addHandler(console_handler)
+        # Callers only enqueue records; a background listener thread does the
+        # formatting and file/console writes off the hot path
+        self._file_handler = file_handler
+        self._log_queue = queue.Queue(-1)
+        self._queue_handler = logging.handlers.QueueHandler(self._log_queue)
+        self.logger.addHandler(self._queue_handler)
+        self._listener = logging.handlers.QueueListener(
+            self._log_queue, file_handler, console_handler, respect_handler_level=True
+        )
+        self._listener.start()
+
+        # The listener thread is a daemon; drain its queue at interpreter exit
+        # unless close() is called first
+        atexit.register(self.close)
 
-        # JSON log for structured data
+        # JSON log for structured data, plus an append-only NDJSON sidecar
+        # so entries logged before a crash are not lost
         self.json_log_file = self.log_dir / f"run_{run_id}.json"
+        self.ndjson_log_file = self.log_dir / f"run_{run_id}.ndjson"
+
+        # Entries record a monotonic offset from here; wall-clock ISO strings
+        # are only built when the log is saved
+        self._wall_start = datetime.now()
+        self._mono_start = time.monotonic()
         self.json_data = {
             'run_id': run_id,
-            'start_time': datetime.now().isoformat(),
+            'start_time': self._wall_start.isoformat(),
             'events': [],
             'detections': [],
             'clips': [],
             'errors': []
         }
 
+        # Sidecar entries carry t_offset; its first line gives the start time.
+        # The file stays open for the run and is flushed after every entry
+        self._ndjson = open(self.ndjson_log_file, 'wb')
+        self._ndjson.write(_json_bytes({'section': 'run', 'run_id': run_id,
+                                        'start_time': self.json_data['start_time']}) + b'\n')
+        self._ndjson.flush()
+
+    def _elapsed(self) -> float:
+        """Seconds since the logger was created"""
+        return time.monotonic() - self._mono_start
+
+    def _stamped(self, entry: Dict) -> Dict:
+        """Copy of an entry with its t_offset turned into an ISO 'timestamp' field"""
+        if 't_offset' not in entry:
+            return entry
+        stamped = {'timestamp': (self._wall_start + timedelta(seconds=entry['t_offset'])).isoformat()}
+        stamped.update((key, value) for key, value in entry.items() if key != 't_offset')
+        return stamped
+
+    def _record(self, section: str, entry: Dict):
+        """Add an entry to the JSON log and append it to the NDJSON sidecar"""
+        self.json_data[section].append(entry)
+        if self._ndjson is None:
+            return
+        try:
+            line = _json_bytes({'section': section, **entry}) + b'\n'
+        except (TypeError, ValueError):
+            return  # e.g. tuple keys or a cycle; the entry stays in json_data
+        self._ndjson.write(line)
+        self._ndjson.flush()
+
     def log_detection(self, detection: Dict):
         """Log an auto-detected event"""
-        self.json_data['detections'].append({
-            'timestamp': datetime.now().isoformat(),
+        self.logger.debug("Detection: %s", detection)
+        self._record('detections', {
+            't_offset': self._elapsed(),
             **detection
         })
-        self.logger.debug(f"Detection: {detection}")
 
     def log_clip_plan(self, clip_plan: Dict):
         """Log clip planning details"""
-        self.json_data['clips'].append({
-            'timestamp': datetime.now().isoformat(),
+        self.logger.info("Clip planned: %s at %s", clip_plan.get('type', 'unknown'), clip_plan.get('abs_ts', 'unknown'))
+        self._record('clips', {
+            't_offset': self._elapsed(),
             **clip_plan
         })
-        self.logger.info(f"Clip planned: {clip_plan.get('type', 'unknown')} at {clip_plan.get('abs_ts', 'unknown')}")
 
     def log_error(self, error: str, context: Dict = None):
         """Log an error with context"""
         error_entry = {
-            'timestamp': datetime.now().isoformat(),
+            't_offset': self._elapsed(),
             'error': error,
             'context': context or {}
         }
-        self.json_data['errors'].append(error_entry)
-        self.logger.error(f"{error} - Context: {context}")
+        self.logger.error("%s - Context: %s", error, context)
+        self._record('errors', error_entry)
 
     def save_json_log(self):
         """Save the JSON log to file"""
         self.json_data['end_time'] = datetime.now().isoformat()
-        with open(self.json_log_file, 'w') as f:
-            json.dump(self.json_data, f, indent=2)
+        json_data = dict(self.json_data)
+        for section in ('events', 'detections', 'clips', 'errors'):
+            json_data[section] = [self._stamped(entry) for entry in json_data[section]]
+        self.json_log_file.write_bytes(_json_bytes(json_data, indent=True))
+
+    def close(self):
+        """
+        Flush queued log records, stop the background listener and close the sidecar.
+
+        Call once at the end of the run; it also runs automatically at exit.
+        """
+        if self._ndjson is not None:
+            self._ndjson.close()
+            self._ndjson = None
+        if self._listener is None:
+            return
+        atexit.unregister(self.close)
+        self.logger.removeHandler(self._queue_handler)
+        self._listener.stop()
+        self._listener = None
+        self._file_handler.close()
 
     def get_logger(self) -> logging.Logger:
         """Get the underlying logger instance"""
         return self.logger
 
+# Event schema used by ValidationUtils
+_EVENT_REQUIRED_FIELDS = ('type', 'half', 'clock')
+_EVENT_TYPES = frozenset({'goal', 'big_save', 'chance', 'foul', 'card'})
+_EVENT_HALVES = frozenset({1, 2})
+
 class ValidationUtils:
     """Validation utilities for events and configuration"""
 
     @staticmethod
     def validate_event(event: Dict) -> Tuple[bool, List[str]]:
         """Validate a single event against the schema"""
-        errors = []
-        required_fields = ['type', 'half', 'clock']
-
         # Check required fields
-        for field in required_fields:
-            if field not in event:
-                errors.append(f"Missing required field: {field}")
+        errors = [f"Missing required field: {field}"
+                  for field in _EVENT_REQUIRED_FIELDS if field not in event]
 
         # Validate types
-        if 'type' in event and event['type'] not in ['goal', 'big_save', 'chance', 'foul', 'card']:
+        if 'type' in event and event['type'] not in _EVENT_TYPES:
             errors.append(f"Invalid event type: {event['type']}")
 
-        if 'half' in event and event['half'] not in [1, 2]:
+        if 'half' in event and event['half'] not in _EVENT_HALVES:
             errors.append(f"Invalid half: {event['half']}")
 
+        # Checked against the clock pattern directly rather than by parsing,
+        # since parse_match_clock maps bad input to 0.0 instead of failing
         if 'clock' in event:
-            try:
-                TimeCodeUtils.parse_match_clock(event['clock'])
-            except:
-                errors.append(f"Invalid clock format: {event['clock']}")
+            clock = event['clock']
+            text = clock.strip() if isinstance(clock, str) else None
+            if text is None or (_CLOCK_RE.match(text) is None and _SECONDS_RE.match(text) is None):
+                errors.append(f"Invalid clock format: {clock}")
 
-        return len(errors) == 0, errors
+        return not errors, errors
 
     @staticmethod
     def validate_events_file(events: List[Dict]) -> Tuple[bool, List[str]]:
@@ -323,12 +556,20 @@ def generate_run_id() -> str:
     """Generate a unique run ID"""
     return datetime.now().strftime("%Y%m%d_%H%M%S")
 
-def load_config(config_path: str = "config.yaml") -> Dict:
-    """Load configuration from YAML file"""
+@lru_cache(maxsize=8)
+def _parse_config(path: str, mtime_ns: int) -> Dict:
+    """Parse a YAML file; mtime_ns is only part of the cache key"""
     import yaml
+    loader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+    with open(path, 'r') as f:
+        return yaml.load(f, Loader=loader)
+
+def load_config(config_path: str = "config.yaml") -> Dict:
+    """Load configuration from YAML file (parsed once per file version)"""
     try:
-        with open(config_path, 'r') as f:
-            return yaml.safe_load(f)
+        path = Path(config_path).resolve()
+        # Callers get their own copy, so edits never leak into the cache
+        return copy.deepcopy(_parse_config(str(path), path.stat().st_mtime_ns))
     except Exception as e:
         raise RuntimeError(f"Failed to load config from {config_path}: {str(e)}")
 
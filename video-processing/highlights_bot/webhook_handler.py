@@ -5,22 +5,100 @@ Provides HTTP endpoint to receive processing requests and return manifest data
 """
 
 import os
+import re
 import json
 import time
 import logging
+import logging.handlers
+import queue
 import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Dict, Optional
-from http.server import HTTPServer, BaseHTTPRequestHandler
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
 import urllib.parse
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 from main import HighlightsBot
 from util import generate_run_id, HighlightsLogger
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Run logs served by /status, and the run ids allowed to name one
+_LOGS_DIR = Path('logs')
+_RUN_ID_RE = re.compile(r'[A-Za-z0-9_-]{1,64}\Z')
+
+# Fields every processing request must carry
+_REQUIRED_FIELDS = frozenset({'match_video', 'events_file'})
+
+# Error body filled in directly; only the message needs JSON escaping
+_ERROR_TMPL = b'{"error":%b,"status_code":%d,"timestamp":"%b"}'
+
+# Largest POST body accepted, in bytes
+MAX_BODY = int(os.environ.get('HL_MAX_BODY', 1 << 20))
+
+# Number of run status summaries kept in memory for /status polls
+STATUS_CACHE_SIZE = 1024
+
+# Shared callback session: keeps connections to callback hosts alive between
+# runs and retries failed connects with a short backoff
+_CALLBACK_SESSION = requests.Session()
+_CALLBACK_ADAPTER = HTTPAdapter(pool_connections=10, pool_maxsize=20,
+                                max_retries=Retry(total=2, backoff_factor=0.2))
+_CALLBACK_SESSION.mount('https://', _CALLBACK_ADAPTER)
+_CALLBACK_SESSION.mount('http://', _CALLBACK_ADAPTER)
+
+# [epoch second, formatted timestamp] reused by every response in that second
+_TS_CACHE = [0, '']
+
+def _now_str() -> str:
+    """Current local time as 'YYYY-MM-DD HH:MM:SS', formatted once per second"""
+    t = int(time.time())
+    cached = _TS_CACHE
+    if cached[0] != t:
+        # Racing threads may both format the same second; either result is correct
+        cached[:] = [t, time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(t))]
+    return cached[1]
+
+def _json_loads(data):
+    """Parse a JSON document from bytes or a bytearray, with orjson when installed"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+def _json_dumps(data) -> bytes:
+    """Serialize to compact UTF-8 JSON bytes, with orjson when installed"""
+    if orjson is not None:
+        return orjson.dumps(data)
+    return json.dumps(data, separators=(',', ':')).encode('utf-8')
+
+def _query_param(query: str, name: str) -> Optional[str]:
+    """First value of name in a raw query string, decoded like parse_qs"""
+    prefix = name + '='
+    for part in query.split('&'):
+        if part.startswith(prefix) and len(part) > len(prefix):
+            return urllib.parse.unquote_plus(part[len(prefix):])
+    return None
+
 class WebhookHandler(BaseHTTPRequestHandler):
     """HTTP request handler for Make.com webhooks"""
 
+    # /health never changes, so its whole response is serialized once
+    _HEALTH_BODY = _json_dumps({'status': 'healthy', 'service': 'highlights-bot'})
+    _HEALTH_RESP = (
+        b'%s 200 OK\r\n'
+        b'Content-Type: application/json\r\n'
+        b'Access-Control-Allow-Origin: *\r\n'
+        b'Content-Length: %d\r\n\r\n'
+        % (BaseHTTPRequestHandler.protocol_version.encode('ascii'), len(_HEALTH_BODY))
+    ) + _HEALTH_BODY
+
     def __init__(self, *args, bot_manager=None, **kwargs):
         self.bot_manager = bot_manager
         super().__init__(*args, **kwargs)
@@ -28,11 +106,44 @@ class WebhookHandler(BaseHTTPRequestHandler):
     def do_POST(self):
         """Handle POST requests for processing"""
         try:
-            content_length = int(self.headers.get('Content-Length', 0))
-            post_data = self.rfile.read(content_length)
+            # Reject bad or oversized bodies before reading anything
+            content_type = self.headers.get('Content-Type', '').lower()
+            if not content_type.startswith('application/json'):
+                self._send_error(415, "Content-Type must be application/json")
+                return
+
+            # Chunked or length-less bodies are not read at all
+            length_header = self.headers.get('Content-Length')
+            if length_header is None:
+                self._send_error(411, "Length required")
+                return
+            try:
+                content_length = int(length_header)
+            except ValueError:
+                content_length = -1
+            if content_length < 0:
+                self._send_error(400, "Invalid Content-Length")
+                return
+            if content_length > MAX_BODY:
+                self._send_error(413, "Payload too large")
+                return
+
+            # Read straight into one buffer of the exact size
+            post_data = bytearray(content_length)
+            view = memoryview(post_data)
+            received = 0
+            while received < content_length:
+                n = self.rfile.readinto(view[received:])
+                if not n:
+                    break
+                received += n
+            view.release()
+            if received < content_length:
+                self._send_error(400, "Incomplete request body")
+                return
 
             # Parse request
-            request_data = json.loads(post_data.decode('utf-8'))
+            request_data = _json_loads(post_data)
 
             # Validate request
             if not self._validate_request(request_data):
@@ -44,53 +155,54 @@ class WebhookHandler(BaseHTTPRequestHandler):
             events_file = request_data.get('events_file')
             callback_url = request_data.get('callback_url')
 
-            # Start processing in background
-            processing_thread = threading.Thread(
-                target=self._process_async,
-                args=(match_video, events_file, callback_url)
-            )
-            processing_thread.daemon = True
-            processing_thread.start()
+            # Missing inputs fail now rather than after a worker picks them up
+            for field, path in (('match_video', match_video), ('events_file', events_file)):
+                if not isinstance(path, str) or not os.path.isfile(path):
+                    self._send_error(400, f"{field} not found")
+                    return
+
+            # Queue processing on the shared worker pool, or push back if full
+            if not self.bot_manager.submit(self._process_async, match_video, events_file, callback_url):
+                self._send_error(503, "Too many matches in progress, retry later")
+                return
 
             # Return immediate response
             self._send_json_response({
                 'status': 'accepted',
                 'message': 'Processing started',
-                'timestamp': time.strftime('%Y-%m-%d %H:%M:%S')
+                'timestamp': _now_str()
             })
 
         except Exception as e:
-            logging.error(f"Webhook error: {str(e)}")
+            logging.error("Webhook error: %s", e)
             self._send_error(500, f"Server error: {str(e)}")
 
     def do_GET(self):
         """Handle GET requests for status"""
         try:
-            # Parse query parameters
-            parsed_url = urllib.parse.urlparse(self.path)
-            query_params = urllib.parse.parse_qs(parsed_url.query)
-
-            if parsed_url.path == '/status':
-                self._handle_status_request(query_params)
-            elif parsed_url.path == '/health':
-                self._send_json_response({'status': 'healthy', 'service': 'highlights-bot'})
+            # Split off the query string; only /status reads a parameter
+            path, _, query = self.path.partition('?')
+
+            if path == '/health':
+                self.wfile.write(self._HEALTH_RESP)
+            elif path == '/status':
+                self._handle_status_request(_query_param(query, 'run_id'))
             else:
                 self._send_error(404, "Not found")
 
         except Exception as e:
-            logging.error(f"GET request error: {str(e)}")
+            logging.error("GET request error: %s", e)
             self._send_error(500, f"Server error: {str(e)}")
 
     def _validate_request(self, data: Dict) -> bool:
         """Validate incoming request data"""
-        required_fields = ['match_video', 'events_file']
-        return all(field in data for field in required_fields)
+        return isinstance(data, dict) and _REQUIRED_FIELDS <= data.keys()
 
     def _process_async(self, match_video: str, events_file: str, callback_url: Optional[str]):
         """Process match asynchronously and send results via callback"""
         try:
-            # Initialize bot
-            bot = HighlightsBot()
+            # Reuse this worker's bot rather than building one per match
+            bot = self.bot_manager.get_bot()
 
             # Process match
             results = bot.process_match(match_video, events_file)
@@ -100,7 +212,7 @@ class WebhookHandler(BaseHTTPRequestHandler):
                 self._send_callback(callback_url, results)
 
         except Exception as e:
-            logging.error(f"Async processing error: {str(e)}")
+            logging.error("Async processing error: %s", e)
 
     def _send_callback(self, callback_url: str, results: Dict):
         """Send processing results to callback URL"""
@@ -115,43 +227,34 @@ class WebhookHandler(BaseHTTPRequestHandler):
                 'errors': results.get('errors', [])
             }
 
-            response = requests.post(
+            response = _CALLBACK_SESSION.post(
                 callback_url,
-                json=callback_data,
+                data=_json_dumps(callback_data),
                 timeout=30,
                 headers={'Content-Type': 'application/json'}
             )
 
             if response.status_code == 200:
-                logging.info(f"Callback sent successfully to {callback_url}")
+                logging.info("Callback sent successfully to %s", callback_url)
             else:
-                logging.warning(f"Callback failed: {response.status_code}")
+                logging.warning("Callback failed: %s", response.status_code)
 
         except Exception as e:
-            logging.error(f"Callback error: {str(e)}")
+            logging.error("Callback error: %s", e)
 
-    def _handle_status_request(self, query_params: Dict):
+    def _handle_status_request(self, run_id: Optional[str]):
         """Handle status check requests"""
-        run_id = query_params.get('run_id', [None])[0]
-
         if run_id:
+            # Only plain ids may name a log file, which rules out path traversal
+            if not _RUN_ID_RE.match(run_id):
+                self._send_error(400, "Invalid run_id")
+                return
+
             # Check specific run status
-            log_file = Path(f"logs/run_{run_id}.json")
+            log_file = _LOGS_DIR / f"run_{run_id}.json"
             if log_file.exists():
                 try:
-                    with open(log_file, 'r') as f:
-                        log_data = json.load(f)
-
-                    status_data = {
-                        'run_id': run_id,
-                        'status': 'completed' if log_data.get('end_time') else 'running',
-                        'start_time': log_data.get('start_time'),
-                        'end_time': log_data.get('end_time'),
-                        'total_clips': len(log_data.get('clips', [])),
-                        'errors': log_data.get('errors', [])
-                    }
-
-                    self._send_json_response(status_data)
+                    self._send_json_response(self.bot_manager.get_run_status(run_id, log_file))
                 except Exception as e:
                     self._send_error(500, f"Failed to read run status: {str(e)}")
             else:
@@ -161,37 +264,32 @@ class WebhookHandler(BaseHTTPRequestHandler):
             self._send_json_response({
                 'service': 'highlights-bot',
                 'status': 'running',
-                'timestamp': time.strftime('%Y-%m-%d %H:%M:%S')
+                'timestamp': _now_str()
             })
 
     def _send_json_response(self, data: Dict, status_code: int = 200):
         """Send JSON response"""
-        self.send_response(status_code)
-        self.send_header('Content-type', 'application/json')
-        self.send_header('Access-Control-Allow-Origin', '*')
-        self.end_headers()
-
-        response_text = json.dumps(data, indent=2)
-        self.wfile.write(response_text.encode('utf-8'))
+        self._send_body(status_code, _json_dumps(data), cors=True)
 
     def _send_error(self, status_code: int, message: str):
         """Send error response"""
+        body = _ERROR_TMPL % (_json_dumps(message), status_code, _now_str().encode('ascii'))
+        self._send_body(status_code, body)
+
+    def _send_body(self, status_code: int, body: bytes, cors: bool = False):
+        """Send a compact JSON body with an explicit Content-Length"""
         self.send_response(status_code)
         self.send_header('Content-type', 'application/json')
+        if cors:
+            self.send_header('Access-Control-Allow-Origin', '*')
+        self.send_header('Content-Length', str(len(body)))
         self.end_headers()
 
-        error_data = {
-            'error': message,
-            'status_code': status_code,
-            'timestamp': time.strftime('%Y-%m-%d %H:%M:%S')
-        }
-
-        response_text = json.dumps(error_data)
-        self.wfile.write(response_text.encode('utf-8'))
+        self.wfile.write(body)
 
     def log_message(self, format, *args):
         """Override to use standard logging"""
-        logging.info(format % args)
+        logging.info(format, *args)
 
 class BotManager:
     """Manages bot instances and processing queue"""
@@ -200,16 +298,101 @@ class BotManager:
         self.active_runs = {}
         self.setup_logging()
 
+        # Fixed pool of processing workers; HL_MAX_PENDING caps how many runs
+        # (running plus queued) are accepted before requests get a 503
+        workers = int(os.environ.get('HL_WORKERS', 4))
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='hlbot')
+        self._slots = threading.BoundedSemaphore(int(os.environ.get('HL_MAX_PENDING', workers * 2)))
+        self._local = threading.local()
+
+        # run_id -> ((mtime_ns, size), status) for recently polled run logs
+        self._status_cache = OrderedDict()
+        self._status_lock = threading.Lock()
+
+    def get_bot(self) -> HighlightsBot:
+        """
+        Get the calling worker thread's bot, creating it on first use.
+
+        One bot per worker keeps construction off the per-request path
+        without sharing an instance across concurrent runs.
+        """
+        bot = getattr(self._local, 'bot', None)
+        if bot is None:
+            bot = self._local.bot = HighlightsBot()
+        return bot
+
+    def submit(self, fn, *args) -> bool:
+        """Queue fn(*args) on the worker pool; returns False when at capacity"""
+        if not self._slots.acquire(blocking=False):
+            return False
+        future = self.executor.submit(fn, *args)
+        future.add_done_callback(lambda _: self._slots.release())
+        return True
+
+    def get_run_status(self, run_id: str, log_file: Path) -> Dict:
+        """
+        Get the status summary of a run from its log file.
+
+        Summaries are cached per run and only rebuilt when the log's mtime or
+        size changes, so repeated polls of an unchanged run skip the parse.
+        """
+        st = log_file.stat()
+        key = (st.st_mtime_ns, st.st_size)
+        with self._status_lock:
+            cached = self._status_cache.get(run_id)
+            if cached is not None and cached[0] == key:
+                self._status_cache.move_to_end(run_id)
+                return cached[1]
+
+        with open(log_file, 'rb') as f:
+            log_data = _json_loads(f.read())
+
+        status_data = {
+            'run_id': run_id,
+            'status': 'completed' if log_data.get('end_time') else 'running',
+            'start_time': log_data.get('start_time'),
+            'end_time': log_data.get('end_time'),
+            'total_clips': len(log_data.get('clips', [])),
+            'errors': log_data.get('errors', [])
+        }
+
+        with self._status_lock:
+            self._status_cache[run_id] = (key, status_data)
+            self._status_cache.move_to_end(run_id)
+            while len(self._status_cache) > STATUS_CACHE_SIZE:
+                self._status_cache.popitem(last=False)
+        return status_data
+
     def setup_logging(self):
         """Setup logging for webhook server"""
-        logging.basicConfig(
-            level=logging.INFO,
-            format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-            handlers=[
-                logging.FileHandler('logs/webhook_server.log'),
-                logging.StreamHandler()
-            ]
+        root = logging.getLogger()
+        if root.handlers:
+            # Already configured by the embedding process
+            self._log_listener = None
+            return
+
+        formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+        file_handler = logging.handlers.RotatingFileHandler(
+            'logs/webhook_server.log', maxBytes=10 * 1024 * 1024, backupCount=5, delay=True
         )
+        console_handler = logging.StreamHandler()
+        for handler in (file_handler, console_handler):
+            handler.setFormatter(formatter)
+
+        # Request threads only enqueue records; one listener thread does the
+        # formatting and the file/console writes
+        log_queue = queue.Queue(-1)
+        root.setLevel(logging.INFO)
+        root.addHandler(logging.handlers.QueueHandler(log_queue))
+        self._log_listener = logging.handlers.QueueListener(log_queue, file_handler, console_handler)
+        self._log_listener.start()
+
+    def close(self):
+        """Wait for queued runs to finish, then flush queued log records"""
+        self.executor.shutdown()
+        if self._log_listener is not None:
+            self._log_listener.stop()
+            self._log_listener = None
 
 def create_handler_class(bot_manager):
     """Create handler class with bot_manager"""
@@ -222,9 +405,11 @@ def start_webhook_server(port: int = 8080, host: str = '0.0.0.0'):
     bot_manager = BotManager()
     handler_class = create_handler_class(bot_manager)
 
-    server = HTTPServer((host, port), handler_class)
+    # One thread per connection, so a slow request never blocks /health
+    server = ThreadingHTTPServer((host, port), handler_class)
+    server.daemon_threads = True
 
-    logging.info(f"Starting webhook server on {host}:{port}")
+    logging.info("Starting webhook server on %s:%s", host, port)
     print(f"🚀 Highlights Bot webhook server running on http://{host}:{port}")
     print(f"📡 Endpoints:")
     print(f"   POST /        - Process match (expects JSON with match_video, events_file)")
@@ -237,6 +422,8 @@ def start_webhook_server(port: int = 8080, host: str = '0.0.0.0'):
     except KeyboardInterrupt:
         print("\n⏹️  Server stopped by user")
         server.shutdown()
+    finally:
+        bot_manager.close()
 
 if __name__ == '__main__':
     import argparse